@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+import catalog
+import mealdb
+import translation
+
+# Registro de países: nomes canônicos da API (inglês) e rótulos em português,
+# nos dois sentidos. É montado uma vez, guardado no catálogo (compartilhado
+# entre sessões e processos) e atualizado em segundo plano quando vence.
+
+AREA_TTL = int(os.environ.get("RECEITA_AREA_TTL", "86400"))
+ALL_LABEL = "Todos"
+
+
+class AreaRegistry:
+    def __init__(self, ttl=AREA_TTL):
+        self.ttl = ttl
+        self._en_to_pt = {}
+        self._pt_to_en = {}
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _set(self, en_to_pt, loaded_at):
+        pt_to_en = {}
+        for en, pt in en_to_pt.items():
+            # Dois países com a mesma tradução: diferencia pelo nome original
+            if pt in pt_to_en:
+                pt = f"{pt} ({en})"
+                en_to_pt[en] = pt
+            pt_to_en[pt] = en
+        self._en_to_pt = en_to_pt
+        self._pt_to_en = pt_to_en
+        self._loaded_at = loaded_at
+
+    # Função para obter os nomes dos países (catálogo local ou API)
+    def _fetch_names(self):
+        names = catalog.areas()
+        if not names:
+            data = mealdb.cached_api_request(mealdb.api_url("list.php", a="list"))
+            names = [area['strArea'] for area in (data or {}).get('meals') or []]
+        return names
+
+    # Função para reconstruir o registro (traduz os nomes em um único lote)
+    def refresh(self):
+        names = self._fetch_names()
+        if not names:
+            return False
+        try:
+            labels = translation.translate_batch(names, 'en', 'pt')
+        except Exception:
+            labels = names
+        en_to_pt = dict(zip(names, labels))
+        try:
+            catalog.save_area_labels(en_to_pt)
+        except Exception:
+            pass
+        with self._lock:
+            self._set(en_to_pt, time.time())
+        return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, name="area-registry", daemon=True).start()
+
+    # Garante que o registro está carregado; se estiver vencido, continua
+    # usando os nomes atuais e atualiza em segundo plano
+    def ensure_loaded(self):
+        if not self._en_to_pt:
+            stored, updated_at = catalog.load_area_labels()
+            if stored:
+                with self._lock:
+                    self._set(stored, updated_at)
+            else:
+                self.refresh()
+        if self._en_to_pt and time.time() - self._loaded_at >= self.ttl:
+            self._refresh_in_background()
+
+    # Rótulos para exibição, com "Todos" no início
+    def labels(self):
+        self.ensure_loaded()
+        return [ALL_LABEL] + sorted(self._pt_to_en)
+
+    # Nome canônico (inglês) de um rótulo; "Todos" e desconhecidos viram None
+    def to_en(self, label):
+        self.ensure_loaded()
+        return self._pt_to_en.get(label)
+
+
+_registry = AreaRegistry()
+
+
+def get_registry():
+    return _registry
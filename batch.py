@@ -0,0 +1,120 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import mealdb
+import search
+import translators
+
+# Processamento em lote: lê listas de despensa em JSON lines, roda a busca
+# (search.py) em um pool de threads ou processos e grava os resultados
+# ordenados em JSON lines, na mesma ordem da entrada.
+#   python batch.py despensas.jsonl sugestoes.jsonl --workers 16
+#
+# Cada linha de entrada: {"id": "u1", "ingredients": ["frango", "arroz"]}
+# ("ingredients" também aceita texto separado por vírgulas; opcionais:
+# "area" em inglês e "max"). Threads compartilham os caches em memória;
+# processos compartilham só os caches em disco (catálogo e traduções), então
+# cada processo aquece os seus.
+
+DEFAULT_WORKERS = int(os.environ.get("RECEITA_BATCH_WORKERS", "8"))
+
+
+def read_pantries(path):
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                request = json.loads(line)
+                request.setdefault('id', str(number))
+                yield request
+
+
+def _ingredients(request):
+    ingredients = request.get('ingredients') or []
+    if isinstance(ingredients, str):
+        ingredients = ingredients.split(',')
+    return [ing.strip() for ing in ingredients if ing.strip()]
+
+
+# Função para processar uma lista de despensa (roda nos workers)
+def process(request, max_recipes=10, translate=True):
+    start = time.perf_counter()
+    result = {'id': request['id']}
+    try:
+        recipes = search.find_recipes(_ingredients(request), request.get('area'),
+                                      request.get('max', max_recipes))
+        if translate:
+            search.translate_results(recipes)
+        result['recipes'] = [
+            {'id': recipe.id, 'name': recipe.base.name,
+             'name_pt': recipe.translated().name if translate else None,
+             'matches': recipe.matches, 'total': recipe.total}
+            for recipe in recipes
+        ]
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run(input_path, output_path, workers=DEFAULT_WORKERS, processes=False, max_recipes=10, translate=True):
+    pantries = list(read_pantries(input_path))
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    latencies = []
+    errors = 0
+
+    start = time.perf_counter()
+    with executor_class(max_workers=workers) as executor, open(output_path, 'w', encoding='utf-8') as out:
+        results = executor.map(process, pantries, [max_recipes] * len(pantries), [translate] * len(pantries),
+                               **({'chunksize': max(1, len(pantries) // (workers * 4))} if processes else {}))
+        for result in results:
+            latencies.append(result['ms'])
+            errors += 'error' in result
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        'requests': len(pantries),
+        'errors': errors,
+        'seconds': round(elapsed, 2),
+        'per_second': round(len(pantries) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'workers': workers,
+        'mode': 'processes' if processes else 'threads',
+    }
+    if not processes:
+        stats['http'] = mealdb.stats()
+        stats['translation'] = translators.get_backend().stats()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sugestões de receitas em lote para listas de despensa")
+    parser.add_argument('input', help="JSON lines com as listas de despensa")
+    parser.add_argument('output', help="JSON lines com as receitas sugeridas")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--processes', action='store_true', help="usa processos em vez de threads")
+    parser.add_argument('--max', type=int, default=10, help="receitas por lista")
+    parser.add_argument('--no-translate', action='store_true', help="não traduz os nomes das receitas")
+    args = parser.parse_args()
+
+    stats = run(args.input, args.output, args.workers, args.processes, args.max, not args.no_translate)
+    print(json.dumps(stats, ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
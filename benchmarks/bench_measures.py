@@ -0,0 +1,76 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import measures
+
+# Compara a normalização de medidas atual (uma passada compilada) com o laço
+# antigo de translate_recipe_data (dicionário recriado + 20 str.replace).
+# Uso: python benchmarks/bench_measures.py [repetições]
+
+SAMPLES = [
+    '1 1/2 cups', '2 tbsp', '1 tbs', '200g', '1.5kg', '½ tsp', '2-3 cloves', '3 Large',
+    'pinch', 'to taste', 'Juice of 1', '1 lb chopped', '2 tbsp + 1 tsp', '1 l', '1 Tbsp.',
+    '2 Tablespoons', '4 oz', '1/4 cup', '500ml', '1 can', '6 slices', '2 pounds', '1 tsp ground',
+]
+
+
+# Laço antigo, mantido aqui apenas como referência de desempenho
+def legacy_adjust(measure_text):
+    replacements = {
+        'tbs': 'colher de sopa',
+        'TBS': 'colher de sopa',
+        'TBSP': 'colheres de sopa',
+        'Tbsp': 'colheres de sopa',
+        'tbsp': 'colheres de sopa',
+        'tsp': 'colher de chá',
+        'TSP': 'colher de chá',
+        'cup': 'xícara',
+        'cups': 'xícaras',
+        'Tblsp': 'colheres de sopa',
+        'TBLSP': 'colheres de sopa',
+        'ounce': 'onça',
+        'ounces': 'onças',
+        'pound': 'libra',
+        'pounds': 'libras',
+        'kg': 'kg',
+        'g': 'g',
+        'ml': 'ml',
+        'liter': 'litro',
+        'l': 'l'
+    }
+    for eng, pt in replacements.items():
+        measure_text = measure_text.replace(eng, pt)
+    return measure_text
+
+
+def compiled_adjust(measure_text):
+    return measures.to_portuguese(measures.parse_measure(measure_text))
+
+
+def compiled_adjust_uncached(measure_text):
+    return measures.to_portuguese(measures.parse_measure.__wrapped__(measure_text))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    benchmarks = (
+        ('laço antigo', legacy_adjust),
+        ('compilado', compiled_adjust),
+        ('sem cache', compiled_adjust_uncached),
+    )
+    for name, func in benchmarks:
+        seconds = min(timeit.repeat(lambda: [func(text) for text in SAMPLES], number=repeat, repeat=5))
+        per_item = seconds / (repeat * len(SAMPLES)) * 1e6
+        print(f"{name:>12}: {per_item:.2f} µs por medida")
+
+    print()
+    print(f"{'medida':<18}{'laço antigo':<34}compilado")
+    for text in SAMPLES:
+        print(f"{text:<18}{legacy_adjust(text):<34}{compiled_adjust(text)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ingredient_index import IngredientIndex
+from recommend import NEUTRAL_RATING, RecommendationEngine
+from stub_mealdb import synthetic_meals
+
+# Compara as recomendações vetorizadas (recommend.py, NumPy) com o laço em
+# Python puro sobre conjuntos de ingredientes, em catálogos sintéticos de
+# vários tamanhos. Confere também que os dois devolvem as mesmas notas.
+# Uso: python benchmarks/bench_recommend.py [--sizes 300 3000 30000] [--k 10]
+
+
+def meal_ingredients(meal):
+    return [meal[f'strIngredient{i}'] for i in range(1, 21) if meal.get(f'strIngredient{i}')]
+
+
+# Laço em Python puro, mantido aqui apenas como referência de desempenho
+class LoopRecommender:
+    def __init__(self, index):
+        self.index = index
+        self.recipes = {}
+
+    def add(self, recipe_id, ingredients):
+        self.recipes[recipe_id] = {i for i in self.index.recipe_ids(ingredients) if i is not None}
+
+    def similar(self, recipe_id, k=5):
+        target = self.recipes[recipe_id]
+        scores = []
+        for other_id, other in self.recipes.items():
+            if other_id != recipe_id and target and other:
+                score = len(target & other) / math.sqrt(len(target) * len(other))
+                if score > 0:
+                    scores.append((score, other_id))
+        return [(other_id, score) for score, other_id in heapq.nlargest(k, scores)]
+
+    def recommend(self, ratings, k=10):
+        profile = {}
+        for recipe_id, rating in ratings.items():
+            ingredients = self.recipes[recipe_id]
+            for ingredient in ingredients:
+                profile[ingredient] = profile.get(ingredient, 0) + (rating - NEUTRAL_RATING) / math.sqrt(len(ingredients))
+        norm = math.sqrt(sum(value * value for value in profile.values()))
+        scores = []
+        for other_id, other in self.recipes.items():
+            if other_id not in ratings and other and norm:
+                score = sum(profile.get(i, 0) for i in other) / (norm * math.sqrt(len(other)))
+                if score > 0:
+                    scores.append((score, other_id))
+        return [(other_id, score) for score, other_id in heapq.nlargest(k, scores)]
+
+
+def same_scores(a, b):
+    return [round(score, 4) for _, score in a] == [round(score, 4) for _, score in b]
+
+
+def run(size, k, repeat, seed):
+    meals = [(meal['idMeal'], meal_ingredients(meal)) for meal in synthetic_meals(size, seed)]
+    index = IngredientIndex()
+    engine = RecommendationEngine(index)
+    loop = LoopRecommender(index)
+
+    build_engine = min(timeit.repeat(lambda: RecommendationEngine(index).add_many(meals), number=1, repeat=3))
+    engine.add_many(meals)
+    for recipe_id, ingredients in meals:
+        loop.add(recipe_id, ingredients)
+    engine.refreshed_at = float('inf')  # sem catálogo: não relê o banco
+
+    rng = random.Random(seed)
+    targets = [recipe_id for recipe_id, _ in rng.sample(meals, min(20, len(meals)))]
+    ratings = {recipe_id: rng.randint(1, 5) for recipe_id, _ in rng.sample(meals, min(8, len(meals)))}
+
+    results = []
+    for name, numpy_call, loop_call in (
+        ('similar', lambda: [engine.similar(t, k) for t in targets], lambda: [loop.similar(t, k) for t in targets]),
+        ('recommend', lambda: engine.recommend(ratings, k), lambda: loop.recommend(ratings, k)),
+    ):
+        calls = len(targets) if name == 'similar' else 1
+        numpy_ms = min(timeit.repeat(numpy_call, number=repeat, repeat=3)) / (repeat * calls) * 1000
+        loop_ms = min(timeit.repeat(loop_call, number=repeat, repeat=3)) / (repeat * calls) * 1000
+        numpy_result, loop_result = numpy_call(), loop_call()
+        if name == 'similar':
+            match = all(same_scores(a, b) for a, b in zip(numpy_result, loop_result))
+        else:
+            match = same_scores(numpy_result, loop_result)
+        results.append((name, numpy_ms, loop_ms, match))
+
+    print(f"\n{size} receitas, {len(index.names)} ingredientes, matriz de "
+          f"{engine.stats()['bytes'] / 1e6:.1f} MB (montada em {build_engine * 1000:.0f} ms)")
+    print(f"{'consulta':<12}{'NumPy (ms)':>12}{'laço (ms)':>12}{'ganho':>9}  mesmas notas")
+    for name, numpy_ms, loop_ms, match in results:
+        print(f"{name:<12}{numpy_ms:>12.3f}{loop_ms:>12.3f}{loop_ms / numpy_ms:>8.1f}x  {'sim' if match else 'NÃO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das recomendações (NumPy x Python puro)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 3000, 30000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.k, args.repeat, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_mealdb import StubMealDB, load_fixtures, synthetic_meals
+
+# Benchmark do caminho de busca sem internet: sobe o TheMealDB falso
+# (stub_mealdb), troca o tradutor pelo falso (fake_translator) e mede, em
+# vários cenários, a busca por ingredientes, a navegação por país e a lista
+# de países, chamando search.py como o app faz. Mostra p50/p95/p99,
+# requisições à API e chamadas ao tradutor por operação.
+# Uso: python benchmarks/bench_search.py [--latency 80] [--sessions 8] [--json saida.json]
+
+QUERIES = [
+    ['frango', 'arroz'],
+    ['alho', 'cebola', 'tomates'],
+    ['salmão', 'limão'],
+    ['ovos', 'leite', 'farinha'],
+    ['queijo', 'espinafre'],
+    ['carne moída', 'cebola', 'alho'],
+    ['quiabo', 'frango'],  # termo fora do glossário: passa pelo tradutor
+]
+MANY_INGREDIENTS = [
+    ['frango', 'arroz', 'alho', 'cebola', 'tomates', 'sal', 'pimenta', 'azeite'],
+    ['ovos', 'leite', 'farinha', 'manteiga', 'açúcar', 'canela', 'mel', 'iogurte'],
+    ['salmão', 'limão', 'alho', 'salsa', 'batatas', 'cenouras', 'ervilhas', 'manjericão'],
+]
+AREAS = ['Italian', 'Indian', 'Mexican', 'Thai', 'French']
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class Bench:
+    def __init__(self, stub, translator):
+        self.stub = stub
+        self.translator = translator
+        self.results = []
+
+    # Esvazia todos os caches do processo e do disco (primeiro acesso)
+    def reset_caches(self):
+        import areas
+        import catalog
+        import ingredient_index
+        import mealdb
+        import recipe_cache
+        import translation_cache
+
+        mealdb.cache_clear()
+        recipe_cache.shared = recipe_cache.RecipeCache()
+        db = translation_cache.get_db()
+        with db:
+            db.execute("DELETE FROM translations")
+        translation_cache._seeded = False
+        db = catalog.get_db()
+        with db:
+            db.execute("DELETE FROM area_labels")
+        areas._registry = areas.AreaRegistry()
+        ingredient_index._index = None
+
+    # Mede uma operação; retorna a duração em segundos
+    def timed(self, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+
+    def run(self, name, calls, cold=False, sessions=1, warmup=False):
+        if warmup:
+            for func, args in calls:
+                func(*args)
+        self.stub.reset_counts()
+        self.translator.reset_counts()
+        latencies = []
+        lock = threading.Lock()
+
+        def worker(session_calls):
+            for func, args in session_calls:
+                if cold:
+                    self.reset_caches()
+                elapsed = self.timed(func, *args)
+                with lock:
+                    latencies.append(elapsed)
+
+        start = time.perf_counter()
+        if sessions == 1:
+            worker(calls)
+        else:
+            threads = [threading.Thread(target=worker, args=(calls,)) for _ in range(sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        wall = time.perf_counter() - start
+
+        ops = len(latencies)
+        result = {
+            'cenario': name,
+            'operacoes': ops,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'ops_por_s': ops / wall if wall else 0.0,
+            'requisicoes': sum(self.stub.requests.values()),
+            'requisicoes_por_op': sum(self.stub.requests.values()) / ops if ops else 0.0,
+            'por_endpoint': dict(self.stub.requests),
+            'traducoes': self.translator.calls,
+            'traducoes_por_op': self.translator.calls / ops if ops else 0.0,
+        }
+        self.results.append(result)
+        return result
+
+    # Busca como a interface faz: encontra as receitas e traduz as exibidas
+    def search(self, ingredients):
+        import search
+        search.translate_results(search.find_recipes(ingredients))
+
+    # Página de um país como a interface faz: busca a página e a traduz
+    def browse(self, area, page):
+        import search
+        page_recipes, _, _ = search.area_page(area, page)
+        search.translate_results(page_recipes)
+
+    def areas(self):
+        import search
+        search.area_labels()
+
+    def scenarios(self, repeat, sessions):
+        search_calls = [(self.search, (query,)) for query in QUERIES]
+        many_calls = [(self.search, (query,)) for query in MANY_INGREDIENTS]
+        browse_calls = [(self.browse, (area, page)) for area in AREAS for page in (0, 1)]
+        areas_calls = [(self.areas, ())]
+
+        self.run('busca, cache frio', search_calls, cold=True)
+        self.run('busca, cache quente', search_calls * repeat, warmup=True)
+        self.run('muitos ingredientes, cache frio', many_calls, cold=True)
+        self.run('muitos ingredientes, cache quente', many_calls * repeat, warmup=True)
+        self.run('país, cache frio', browse_calls, cold=True)
+        self.run('país, cache quente', browse_calls * repeat, warmup=True)
+        self.run('lista de países, cache frio', areas_calls * len(QUERIES), cold=True)
+        self.run('lista de países, cache quente', areas_calls * repeat * 10, warmup=True)
+        self.reset_caches()
+        self.run(f'{sessions} sessões, cache frio', search_calls + browse_calls, sessions=sessions)
+        self.run(f'{sessions} sessões, cache quente', (search_calls + browse_calls) * repeat, sessions=sessions)
+
+
+def print_report(results):
+    print(f"{'cenário':<36}{'ops':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ops/s':>9}{'req/op':>8}{'trad/op':>9}")
+    for r in results:
+        print(f"{r['cenario']:<36}{r['operacoes']:>5}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['ops_por_s']:>9.1f}{r['requisicoes_por_op']:>8.1f}{r['traducoes_por_op']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca com TheMealDB e tradutor falsos")
+    parser.add_argument('--latency', type=float, default=50, help="latência da API falsa em ms")
+    parser.add_argument('--jitter', type=float, default=20, help="latência aleatória extra em ms")
+    parser.add_argument('--translator-latency', type=float, default=150, help="latência do tradutor em ms")
+    parser.add_argument('--fixtures', help="receitas gravadas (stub_mealdb.py --record)")
+    parser.add_argument('--meals', type=int, default=300, help="receitas sintéticas (sem --fixtures)")
+    parser.add_argument('--sessions', type=int, default=8, help="sessões concorrentes")
+    parser.add_argument('--repeat', type=int, default=3, help="repetições dos cenários com cache quente")
+    parser.add_argument('--catalog', action='store_true', help="carrega o catálogo local antes de medir")
+    parser.add_argument('--json', metavar='ARQUIVO', help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    meals = load_fixtures(args.fixtures) if args.fixtures else synthetic_meals(args.meals)
+    stub = StubMealDB(meals, args.latency / 1000, args.jitter / 1000).start()
+
+    # Configuração lida na importação dos módulos do app
+    workdir = tempfile.mkdtemp(prefix="receita-bench-")
+    os.environ['MEALDB_API_BASE'] = stub.base_url
+    os.environ['RECEITA_CATALOG_DB'] = os.path.join(workdir, 'catalog.sqlite3')
+    os.environ['RECEITA_TRANSLATION_DB'] = os.path.join(workdir, 'translations.sqlite3')
+    os.environ['RECEITA_IMAGE_CACHE'] = os.path.join(workdir, 'images')
+    # O aquecimento em segundo plano faria requisições durante as medidas
+    os.environ['RECEITA_WARM'] = '0'
+
+    import fake_translator
+    translator = fake_translator.install(args.translator_latency / 1000)
+
+    import catalog
+    if args.catalog:
+        catalog.bulk_load()
+
+    bench = Bench(stub, translator)
+    print(f"{len(meals)} receitas, API {args.latency:.0f}±{args.jitter:.0f} ms, "
+          f"tradutor {args.translator_latency:.0f} ms, catálogo {'carregado' if args.catalog else 'vazio'}")
+    bench.scenarios(args.repeat, args.sessions)
+    print_report(bench.results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(bench.results, f, ensure_ascii=False, indent=2)
+    stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import snapshot
+from stub_mealdb import synthetic_meals
+
+# Compara o snapshot colunar (snapshot.py) com os mesmos dados em JSON (as
+# respostas do lookup.php, como eram carregadas antes): tamanho em disco e
+# tempo para gravar e ler (o melhor de 3 leituras), com traduções sintéticas
+# de nomes e instruções. "meta" é a leitura feita ao iniciar o app quando o
+# snapshot já foi aplicado.
+# Uso: python benchmarks/bench_snapshot.py [--sizes 300 3000 30000]
+
+
+def build(size):
+    meals = {meal['idMeal']: snapshot.processed_meal(meal) for meal in synthetic_meals(size)}
+    translations = {}
+    for meal in meals.values():
+        for text in (meal['strMeal'], meal['strInstructions']):
+            translations[('en', 'pt', text)] = (f"pt:{text}", False)
+    return snapshot.Snapshot(meals, translations=translations)
+
+
+def timed(func, repeat=1):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def run(size):
+    source = build(size)
+    folder = tempfile.mkdtemp()
+    paths = {name: os.path.join(folder, name) for name in ('plain.snap', 'compressed.snap', 'meals.json')}
+
+    rows = []
+    for name, compress in (('plain.snap', False), ('compressed.snap', True)):
+        _, write_ms = timed(lambda: source.write(paths[name], compress))
+        loaded, read_ms = timed(lambda: snapshot.read(paths[name]), 3)
+        assert loaded.meals == source.meals and loaded.translations == source.translations
+        _, meta_ms = timed(lambda: snapshot.read_meta(paths[name]), 3)
+        rows.append((name, os.path.getsize(paths[name]), write_ms, read_ms, meta_ms))
+
+    def write_json():
+        with open(paths['meals.json'], 'w', encoding='utf-8') as f:
+            json.dump({'meals': list(source.meals.values()),
+                       'translations': [[*key, *value] for key, value in source.translations.items()]}, f)
+
+    def read_json():
+        with open(paths['meals.json'], encoding='utf-8') as f:
+            return json.load(f)
+
+    _, write_ms = timed(write_json)
+    _, read_ms = timed(read_json, 3)
+    rows.append(('meals.json', os.path.getsize(paths['meals.json']), write_ms, read_ms, None))
+
+    print(f"\n{size} receitas, {len(source.translations)} traduções")
+    print(f"{'arquivo':<18}{'MB':>8}{'gravar (ms)':>14}{'ler (ms)':>11}{'meta (ms)':>11}")
+    for name, nbytes, write_ms, read_ms, meta_ms in rows:
+        meta = '-' if meta_ms is None else f"{meta_ms:.1f}"
+        print(f"{name:<18}{nbytes / 1e6:>8.2f}{write_ms:>14.0f}{read_ms:>11.0f}{meta:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos snapshots do catálogo")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 3000, 30000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == '__main__':
+    main()
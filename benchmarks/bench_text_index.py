@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import text_index
+from recipe_cache import Recipe
+from stub_mealdb import synthetic_meals
+
+# Mede a busca textual local (text_index.py) em catálogos sintéticos: tempo
+# para indexar, gravar e carregar o índice e latência das consultas
+# (palavras inteiras, prefixos e várias palavras). Só inglês: o cache de
+# traduções não é consultado.
+# Uso: python benchmarks/bench_text_index.py [--sizes 300 3000 30000]
+
+QUERIES = ['chicken', 'chick', 'rice', 'garlic onion', 'tomato pasta bake', 'sal', 'curry', 'xyzzy',
+           'indian', 'simmer gently']
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def run(size, repeat):
+    recipes = [Recipe.from_meal(meal) for meal in synthetic_meals(size)]
+    path = os.path.join(tempfile.mkdtemp(), "text_index.json")
+    index = text_index.TextIndex(path)
+    index.refreshed_at = float('inf')  # sem catálogo: não relê o banco
+
+    start = time.perf_counter()
+    for recipe in recipes:
+        weights, length = text_index.document(text_index.recipe_fields(recipe))
+        index.add(recipe.id, weights, length)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.save(force=True)
+    save = time.perf_counter() - start
+    start = time.perf_counter()
+    loaded = text_index.TextIndex(path)
+    loaded.load()
+    load = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            index.search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"\n{size} receitas, {index.stats()['terms']} termos, {os.path.getsize(path) / 1e6:.1f} MB em disco")
+    print(f"  indexar {build * 1000:.0f} ms, gravar {save * 1000:.0f} ms, carregar {load * 1000:.0f} ms")
+    print(f"  consulta p50 {percentile(latencies, 50):.3f} ms, p95 {percentile(latencies, 95):.3f} ms, "
+          f"p99 {percentile(latencies, 99):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca textual local")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 3000, 30000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
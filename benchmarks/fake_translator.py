@@ -0,0 +1,43 @@
+import threading
+import time
+
+# Tradutor falso e determinístico, com a mesma interface do GoogleTranslator
+# usada por translators.RemoteTranslator. Conta chamadas e caracteres e pode
+# simular a latência do serviço real.
+
+
+class FakeTranslator:
+    calls = 0
+    chars = 0
+    latency = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, source='auto', target='pt'):
+        self.source = source
+        self.target = target
+
+    def translate(self, text):
+        with FakeTranslator._lock:
+            FakeTranslator.calls += 1
+            FakeTranslator.chars += len(text)
+        if FakeTranslator.latency:
+            time.sleep(FakeTranslator.latency)
+        return '\n'.join(f"{self.target}:{line}" if line.strip() else line for line in text.split('\n'))
+
+    def translate_batch(self, batch):
+        return [self.translate(text) for text in batch]
+
+    @classmethod
+    def reset_counts(cls):
+        with cls._lock:
+            cls.calls = 0
+            cls.chars = 0
+
+
+# Troca o tradutor remoto do app pelo falso (o glossário local continua na
+# frente, conforme RECEITA_TRANSLATOR)
+def install(latency=0.0):
+    import translators
+    FakeTranslator.latency = latency
+    translators.set_backend(translators.build_backend(client=FakeTranslator))
+    return FakeTranslator
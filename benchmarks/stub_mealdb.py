@@ -0,0 +1,208 @@
+import argparse
+import json
+import random
+import string
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+from urllib.request import urlopen
+
+# Servidor local que imita o TheMealDB (search/lookup/filter/list.php) a
+# partir de receitas gravadas, com latência configurável. Usado pelos
+# benchmarks e para rodar o app sem internet:
+#   python benchmarks/stub_mealdb.py --port 8765 --latency 80
+#   MEALDB_API_BASE=http://127.0.0.1:8765/api/json/v1/1 streamlit run receita2.py
+# Para gravar receitas reais: python benchmarks/stub_mealdb.py --record fixtures.json
+
+API_PATH = "/api/json/v1/1"
+REAL_API = "https://www.themealdb.com/api/json/v1/1"
+
+AREAS = ['American', 'British', 'Chinese', 'French', 'Indian', 'Italian', 'Japanese', 'Mexican',
+         'Moroccan', 'Portuguese', 'Spanish', 'Thai']
+CATEGORIES = ['Beef', 'Chicken', 'Dessert', 'Lamb', 'Pasta', 'Pork', 'Seafood', 'Side', 'Vegetarian']
+INGREDIENTS = [
+    'Chicken', 'Chicken Breast', 'Rice', 'Onion', 'Garlic', 'Salt', 'Pepper', 'Black Pepper', 'Sugar',
+    'Butter', 'Milk', 'Water', 'Flour', 'Olive Oil', 'Vegetable Oil', 'Potatoes', 'Carrots', 'Tomatoes',
+    'Chopped Tomatoes', 'Lemon', 'Lime', 'Ginger', 'Cumin', 'Paprika', 'Cinnamon', 'Parsley', 'Coriander',
+    'Basil', 'Oregano', 'Thyme', 'Rosemary', 'Bay Leaf', 'Salmon', 'Tuna', 'Prawns', 'Bacon', 'Ham',
+    'Cheese', 'Parmesan', 'Mozzarella', 'Double Cream', 'Yogurt', 'Honey', 'Soy Sauce', 'Chicken Stock',
+    'Beef Stock', 'Spinach', 'Mushrooms', 'Peas', 'Celery', 'Broccoli', 'Aubergine', 'Red Pepper',
+    'Chilli', 'Coconut Milk', 'Eggs', 'Spaghetti', 'Noodles', 'Vinegar', 'Mustard', 'Minced Beef',
+    'Pork Chops', 'Cod', 'Duck', 'Bread', 'Breadcrumbs', 'Dark Chocolate', 'Vanilla Extract',
+]
+MEASURES = ['1 1/2 cups', '2 tbsp', '1 tsp', '200g', '1.5kg', '½ tsp', '2 cloves', '3 Large', 'pinch',
+            'to taste', '1 lb chopped', '1 l', '4 oz', '1/4 cup', '500ml', '1 can', '6 slices', '2 chopped']
+WORDS = ['heat', 'the', 'oil', 'in', 'a', 'large', 'pan', 'add', 'and', 'cook', 'for', 'minutes',
+         'until', 'golden', 'stir', 'season', 'with', 'serve', 'hot', 'simmer', 'gently', 'covered']
+
+
+# Função para gerar receitas sintéticas, sempre as mesmas para a mesma semente
+def synthetic_meals(count=300, seed=42):
+    rng = random.Random(seed)
+    meals = []
+    for n in range(count):
+        ingredients = rng.sample(INGREDIENTS, rng.randint(4, 14))
+        name = f"{rng.choice(string.ascii_uppercase)}{n:04d} {ingredients[0]} {rng.choice(['Stew', 'Curry', 'Pie', 'Bake', 'Salad'])}"
+        steps = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + '.'
+                 for _ in range(rng.randint(3, 8))]
+        meal = {
+            'idMeal': str(50000 + n),
+            'strMeal': name,
+            'strCategory': rng.choice(CATEGORIES),
+            'strArea': rng.choice(AREAS),
+            'strInstructions': '\r\n'.join(steps),
+            'strMealThumb': '',
+            'strTags': None,
+            'strYoutube': '',
+            'strSource': None,
+        }
+        for i in range(1, 21):
+            meal[f'strIngredient{i}'] = ingredients[i - 1] if i <= len(ingredients) else ''
+            meal[f'strMeasure{i}'] = rng.choice(MEASURES) if i <= len(ingredients) else ' '
+        meals.append(meal)
+    return meals
+
+
+def load_fixtures(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['meals']
+
+
+# Função para gravar receitas reais da API (busca por letra inicial)
+def record_fixtures(path, letters=string.ascii_lowercase):
+    meals = []
+    for letter in letters:
+        with urlopen(f"{REAL_API}/search.php?f={letter}", timeout=20) as response:
+            meals.extend(json.load(response).get('meals') or [])
+        time.sleep(0.5)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meals': meals}, f, ensure_ascii=False)
+    return len(meals)
+
+
+def _ingredients(meal):
+    return [(meal.get(f'strIngredient{i}') or '').strip() for i in range(1, 21)
+            if (meal.get(f'strIngredient{i}') or '').strip()]
+
+
+def _summary(meal):
+    return {'idMeal': meal['idMeal'], 'strMeal': meal['strMeal'], 'strMealThumb': meal['strMealThumb']}
+
+
+class StubMealDB:
+    def __init__(self, meals, latency=0.0, jitter=0.0, host='127.0.0.1', port=0):
+        self.meals = {meal['idMeal']: meal for meal in meals}
+        self.latency = latency
+        self.jitter = jitter
+        # Status das respostas; outro valor (ex: 503) simula a API com falha
+        self.status = 200
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._by_ingredient = {}
+        self._by_area = {}
+        self._by_category = {}
+        for meal in meals:
+            for ingredient in _ingredients(meal):
+                self._by_ingredient.setdefault(ingredient.lower(), []).append(meal)
+            self._by_area.setdefault(meal['strArea'], []).append(meal)
+            self._by_category.setdefault(meal['strCategory'], []).append(meal)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = json.dumps(stub.handle(self.path)).encode()
+                self.send_response(stub.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def handle(self, path):
+        url = urlparse(path)
+        endpoint = url.path.rsplit('/', 1)[-1]
+        params = dict(parse_qsl(url.query))
+        with self._lock:
+            self.requests[endpoint] += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if endpoint == 'search.php':
+            letter = params.get('f', '').lower()
+            meals = [meal for meal in self.meals.values() if meal['strMeal'].lower().startswith(letter)]
+        elif endpoint == 'lookup.php':
+            meals = [self.meals[params['i']]] if params.get('i') in self.meals else []
+        elif endpoint == 'filter.php':
+            if 'i' in params:
+                matches = self._by_ingredient.get(params['i'].lower(), [])
+            elif 'a' in params:
+                matches = self._by_area.get(params['a'], [])
+            else:
+                matches = self._by_category.get(params.get('c'), [])
+            meals = [_summary(meal) for meal in matches]
+        elif endpoint == 'list.php':
+            if 'a' in params:
+                meals = [{'strArea': area} for area in sorted(self._by_area)]
+            elif 'c' in params:
+                meals = [{'strCategory': category} for category in sorted(self._by_category)]
+            else:
+                names = sorted({ingredient for meal in self.meals.values() for ingredient in _ingredients(meal)})
+                meals = [{'idIngredient': str(n), 'strIngredient': name} for n, name in enumerate(names, 1)]
+        else:
+            meals = []
+        # Como a API real, "nenhum resultado" é {"meals": null}
+        return {'meals': meals or None}
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-mealdb", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita o TheMealDB")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help="latência fixa em ms")
+    parser.add_argument('--jitter', type=float, default=0, help="latência aleatória extra em ms")
+    parser.add_argument('--fixtures', help="arquivo JSON gravado com --record")
+    parser.add_argument('--meals', type=int, default=300, help="receitas sintéticas (sem --fixtures)")
+    parser.add_argument('--record', metavar='ARQUIVO', help="grava receitas da API real e sai")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"{record_fixtures(args.record)} receitas gravadas em {args.record}")
+        return
+
+    meals = load_fixtures(args.fixtures) if args.fixtures else synthetic_meals(args.meals)
+    stub = StubMealDB(meals, args.latency / 1000, args.jitter / 1000, port=args.port)
+    print(f"{len(meals)} receitas em {stub.base_url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,477 @@
+import json
+import os
+import string
+import threading
+import time
+from contextlib import contextmanager
+
+import mealdb
+from storage import open_db
+
+# Catálogo local (SQLite) espelhando o TheMealDB: receitas, ingredientes,
+# países e categorias. É carregado uma vez e atualizado aos poucos em segundo
+# plano, tirando as chamadas à API do caminho das buscas.
+
+CATALOG_PATH = os.environ.get("RECEITA_CATALOG_DB", "catalog.sqlite3")
+# Tempo (segundos) até uma parte do catálogo ser considerada desatualizada
+SYNC_INTERVAL = int(os.environ.get("RECEITA_CATALOG_SYNC_INTERVAL", "21600"))
+
+LETTERS = string.ascii_lowercase
+LIST_KINDS = {'area': 'a', 'category': 'c', 'ingredient': 'i'}
+LIST_FIELDS = {'area': 'strArea', 'category': 'strCategory', 'ingredient': 'strIngredient'}
+# Campos da API guardados no catálogo (os de recipe_cache.FIELDS), além dos
+# ingredientes e medidas preenchidos
+MEAL_FIELDS = ('idMeal', 'strMeal', 'strCategory', 'strArea', 'strInstructions', 'strMealThumb',
+               'strTags', 'strSource', 'strYoutube')
+# O SQLite limita a quantidade de parâmetros por consulta
+_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meals (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    area TEXT,
+    letter TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_meals_area ON meals(area);
+CREATE INDEX IF NOT EXISTS idx_meals_letter ON meals(letter);
+CREATE TABLE IF NOT EXISTS meal_ingredients (
+    meal_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    ingredient TEXT NOT NULL,
+    measure TEXT,
+    PRIMARY KEY (meal_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_meal_ingredients_name ON meal_ingredients(ingredient);
+-- Contador de alterações: cada gravação ou remoção de uma receita recebe o
+-- próximo número (meals.seq), que nunca se repete nem volta atrás
+CREATE TABLE IF NOT EXISTS meal_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    meal_id TEXT NOT NULL
+);
+-- Receitas removidas, com o número da remoção, para quem acompanha as
+-- alterações pelo seq (recomendações e busca textual)
+CREATE TABLE IF NOT EXISTS deleted_meals (
+    meal_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deleted_meals_seq ON deleted_meals(seq);
+CREATE TABLE IF NOT EXISTS lists (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+CREATE TABLE IF NOT EXISTS area_labels (
+    en TEXT PRIMARY KEY,
+    pt TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    base TEXT,
+    applied_at REAL NOT NULL
+);
+"""
+
+
+# Catálogos criados antes de meals.seq: acrescenta a coluna e numera as
+# receitas existentes na ordem em que foram gravadas
+def _migrate(db):
+    columns = {row['name'] for row in db.execute("PRAGMA table_info(meals)")}
+    if 'seq' not in columns:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row['name'] for row in db.execute("PRAGMA table_info(meals)")}
+            if 'seq' not in columns:
+                db.execute("ALTER TABLE meals ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+                db.execute("INSERT INTO meal_changes (meal_id) SELECT id FROM meals ORDER BY updated_at")
+                db.execute("UPDATE meals SET seq = (SELECT MAX(c.seq) FROM meal_changes c WHERE c.meal_id = meals.id)")
+                db.execute("DELETE FROM meal_changes WHERE seq < (SELECT MAX(seq) FROM meal_changes)")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    db.execute("CREATE INDEX IF NOT EXISTS idx_meals_seq ON meals(seq)")
+
+
+def get_db():
+    return open_db(CATALOG_PATH, SCHEMA, _migrate)
+
+
+# Função para extrair os pares (ingrediente, medida) de uma receita da API
+def meal_ingredients(meal):
+    pairs = []
+    for i in range(1, 21):
+        ingredient = (meal.get(f'strIngredient{i}') or '').strip()
+        if ingredient:
+            pairs.append((ingredient, (meal.get(f'strMeasure{i}') or '').strip()))
+    return pairs
+
+
+# Função para reduzir uma receita da API aos campos que o app usa, sem os
+# strIngredientN/strMeasureN vazios. É a forma gravada no catálogo e nos
+# snapshots, então a mesma receita vinda da API ou de um snapshot é igual.
+def compact_meal(meal):
+    compact = {field: meal.get(field) or '' for field in MEAL_FIELDS}
+    for i, (ingredient, measure) in enumerate(meal_ingredients(meal), 1):
+        compact[f'strIngredient{i}'] = ingredient
+        compact[f'strMeasure{i}'] = measure
+    return compact
+
+
+# Próximo número do contador de alterações (só o último fica guardado)
+def _next_seq(db, meal_id):
+    seq = db.execute("INSERT INTO meal_changes (meal_id) VALUES (?)", (meal_id,)).lastrowid
+    db.execute("DELETE FROM meal_changes WHERE seq < ?", (seq,))
+    return seq
+
+
+# Função para inserir/atualizar uma receita (só grava se o conteúdo mudou)
+def _upsert_meal(db, meal):
+    meal = compact_meal(meal)
+    data = json.dumps(meal, sort_keys=True)
+    name = meal.get('strMeal') or ''
+    cursor = db.execute(
+        """
+        INSERT INTO meals (id, name, category, area, letter, data, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name, category = excluded.category, area = excluded.area,
+            letter = excluded.letter, data = excluded.data, updated_at = excluded.updated_at
+        WHERE meals.data != excluded.data
+        """,
+        (meal['idMeal'], name, meal.get('strCategory'), meal.get('strArea'),
+         name[:1].lower(), data, time.time())
+    )
+    if cursor.rowcount:
+        db.execute("UPDATE meals SET seq = ? WHERE id = ?", (_next_seq(db, meal['idMeal']), meal['idMeal']))
+        db.execute("DELETE FROM deleted_meals WHERE meal_id = ?", (meal['idMeal'],))
+        db.execute("DELETE FROM meal_ingredients WHERE meal_id = ?", (meal['idMeal'],))
+        db.executemany(
+            "INSERT INTO meal_ingredients (meal_id, position, ingredient, measure) VALUES (?, ?, ?, ?)",
+            [(meal['idMeal'], pos, ing.lower(), measure)
+             for pos, (ing, measure) in enumerate(meal_ingredients(meal), 1)]
+        )
+    return bool(cursor.rowcount)
+
+
+# Função para remover uma receita, registrando a remoção no contador
+def _delete_meal(db, meal_id):
+    if db.execute("DELETE FROM meals WHERE id = ?", (meal_id,)).rowcount:
+        db.execute("DELETE FROM meal_ingredients WHERE meal_id = ?", (meal_id,))
+        db.execute("INSERT OR REPLACE INTO deleted_meals (meal_id, seq) VALUES (?, ?)",
+                   (meal_id, _next_seq(db, meal_id)))
+
+
+def upsert_meal(meal):
+    db = get_db()
+    with db:
+        return _upsert_meal(db, meal)
+
+
+# Funções usadas pelos snapshots do catálogo (snapshot.py)
+
+def upsert_meals(meals):
+    db = get_db()
+    with db:
+        return sum(_upsert_meal(db, meal) for meal in meals)
+
+
+def delete_meals(meal_ids):
+    db = get_db()
+    with db:
+        for meal_id in meal_ids:
+            _delete_meal(db, meal_id)
+
+
+def all_meals():
+    rows = get_db().execute("SELECT data FROM meals ORDER BY id").fetchall()
+    return [json.loads(row['data']) for row in rows]
+
+
+def all_lists():
+    lists = {kind: [] for kind in LIST_KINDS}
+    for row in get_db().execute("SELECT kind, name FROM lists ORDER BY kind, name"):
+        lists.setdefault(row['kind'], []).append(row['name'])
+    return lists
+
+
+def replace_lists(lists):
+    db = get_db()
+    with db:
+        for kind, names in lists.items():
+            db.execute("DELETE FROM lists WHERE kind = ?", (kind,))
+            db.executemany("INSERT OR IGNORE INTO lists (kind, name) VALUES (?, ?)",
+                           [(kind, name) for name in names])
+
+
+def sync_state():
+    return {row['key']: row['synced_at'] for row in get_db().execute("SELECT key, synced_at FROM sync_state")}
+
+
+# Mantém a data de sincronização mais recente de cada parte
+def merge_sync_state(state):
+    db = get_db()
+    with db:
+        db.executemany(
+            "INSERT INTO sync_state (key, synced_at) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET synced_at = MAX(synced_at, excluded.synced_at)",
+            list(state.items())
+        )
+
+
+# Registra um snapshot aplicado; se o id já existe (o mesmo conteúdo de
+# novo), só atualiza a data e mantém o tipo e a origem do primeiro registro
+def record_snapshot(snapshot_id, kind, base=None):
+    db = get_db()
+    with db:
+        db.execute("INSERT INTO snapshots (id, kind, base, applied_at) VALUES (?, ?, ?, ?) "
+                   "ON CONFLICT(id) DO UPDATE SET applied_at = excluded.applied_at",
+                   (snapshot_id, kind, base, time.time()))
+
+
+def has_snapshot(snapshot_id):
+    return get_db().execute("SELECT 1 FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone() is not None
+
+
+def _mark_synced(db, key):
+    db.execute(
+        "INSERT OR REPLACE INTO sync_state (key, synced_at) VALUES (?, ?)",
+        (key, time.time())
+    )
+
+
+# Função para sincronizar todas as receitas que começam com uma letra
+def sync_letter(letter):
+    data = mealdb.fetch_json("search.php", f=letter)
+    if data is None:
+        return None
+
+    meals = data.get('meals') or []
+    db = get_db()
+    with db:
+        changed = sum(_upsert_meal(db, meal) for meal in meals)
+        # Remove receitas que deixaram de existir na API
+        ids = [meal['idMeal'] for meal in meals]
+        stale = db.execute(
+            f"SELECT id FROM meals WHERE letter = ? AND id NOT IN ({','.join('?' * len(ids))})",
+            [letter] + ids
+        ).fetchall()
+        for row in stale:
+            _delete_meal(db, row['id'])
+        _mark_synced(db, f"letter:{letter}")
+    return changed + len(stale)
+
+
+# Função para sincronizar uma das listas (países, categorias ou ingredientes)
+def sync_list(kind):
+    data = mealdb.fetch_json("list.php", **{LIST_KINDS[kind]: 'list'})
+    if data is None or not data.get('meals'):
+        return None
+
+    field = LIST_FIELDS[kind]
+    names = [item[field] for item in data['meals'] if item.get(field)]
+    db = get_db()
+    with db:
+        db.execute("DELETE FROM lists WHERE kind = ?", (kind,))
+        db.executemany("INSERT OR IGNORE INTO lists (kind, name) VALUES (?, ?)",
+                       [(kind, name) for name in names])
+        _mark_synced(db, f"list:{kind}")
+    return len(names)
+
+
+def sync_keys():
+    return [f"list:{kind}" for kind in LIST_KINDS] + [f"letter:{letter}" for letter in LETTERS]
+
+
+def sync_key(key):
+    kind, name = key.split(':', 1)
+    if kind == 'list':
+        return sync_list(name)
+    return sync_letter(name)
+
+
+# Função para listar as partes do catálogo mais antigas que o intervalo
+def stale_keys(max_age=SYNC_INTERVAL):
+    synced = {row['key']: row['synced_at']
+              for row in get_db().execute("SELECT key, synced_at FROM sync_state")}
+    now = time.time()
+    keys = [key for key in sync_keys() if now - synced.get(key, 0) >= max_age]
+    return sorted(keys, key=lambda key: synced.get(key, 0))
+
+
+# Carga completa (usada na primeira execução)
+def bulk_load():
+    for key in sync_keys():
+        sync_key(key)
+
+
+def is_loaded():
+    row = get_db().execute("SELECT COUNT(*) FROM sync_state").fetchone()
+    return row[0] >= len(sync_keys())
+
+
+# Consultas locais
+
+def get_meal(meal_id):
+    row = get_db().execute("SELECT data FROM meals WHERE id = ?", (str(meal_id),)).fetchone()
+    return json.loads(row['data']) if row else None
+
+
+def meal_ids_by_area(area):
+    rows = get_db().execute(
+        "SELECT id FROM meals WHERE area = ? ORDER BY name", (area,)
+    ).fetchall()
+    return [row['id'] for row in rows]
+
+
+def meal_ids_by_ingredient(ingredient):
+    rows = get_db().execute(
+        "SELECT DISTINCT meal_id FROM meal_ingredients WHERE ingredient = ?",
+        (ingredient.lower().strip(),)
+    ).fetchall()
+    return [row['meal_id'] for row in rows]
+
+
+# Função para listar os ingredientes (na ordem da receita) de várias receitas,
+# opcionalmente só as de um país. Retorna {id: [ingredientes]}.
+def ingredients_by_meal(meal_ids, area=None):
+    meal_ids = list(meal_ids)
+    result = {}
+    db = get_db()
+    for start in range(0, len(meal_ids), _CHUNK):
+        chunk = meal_ids[start:start + _CHUNK]
+        query = ("SELECT i.meal_id, i.ingredient FROM meal_ingredients i JOIN meals m ON m.id = i.meal_id "
+                 f"WHERE i.meal_id IN ({','.join('?' * len(chunk))})")
+        if area:
+            query += " AND m.area = ?"
+            chunk.append(area)
+        for row in db.execute(query + " ORDER BY i.meal_id, i.position", chunk):
+            result.setdefault(row['meal_id'], []).append(row['ingredient'])
+    return result
+
+
+# Leituras das alterações feitas em uma única transação, para que as
+# gravações e as remoções venham do mesmo estado do catálogo
+@contextmanager
+def _read_transaction(db):
+    db.execute("BEGIN")
+    try:
+        yield db
+    finally:
+        db.commit()
+
+
+# Ids das receitas removidas depois da alteração `since` e maior seq
+# encontrado entre eles
+def _deleted_since(db, since):
+    rows = db.execute("SELECT meal_id, seq FROM deleted_meals WHERE seq > ?", (since,)).fetchall()
+    return [row['meal_id'] for row in rows], max((row['seq'] for row in rows), default=since)
+
+
+# Função para listar os ingredientes das receitas gravadas/alteradas depois
+# da alteração `since` (meals.seq). Retorna ({id: [ingredientes]}, ids
+# removidos, maior seq encontrado). O seq só cresce e é dado dentro da
+# transação de escrita, então uma alteração confirmada depois da leitura
+# nunca fica para trás.
+def meal_ingredients_since(since=0):
+    with _read_transaction(get_db()) as db:
+        rows = db.execute(
+            "SELECT m.id, m.seq, i.ingredient FROM meals m "
+            "JOIN meal_ingredients i ON i.meal_id = m.id "
+            "WHERE m.seq > ? ORDER BY m.id, i.position",
+            (since,)
+        ).fetchall()
+        deleted, latest = _deleted_since(db, since)
+    result = {}
+    for row in rows:
+        result.setdefault(row['id'], []).append(row['ingredient'])
+        latest = max(latest, row['seq'])
+    return result, deleted, latest
+
+
+# Função para listar as receitas gravadas/alteradas depois da alteração
+# `since`, no formato da API. Retorna (receitas, ids removidos, maior seq
+# encontrado).
+def meals_since(since=0):
+    with _read_transaction(get_db()) as db:
+        rows = db.execute(
+            "SELECT data, seq FROM meals WHERE seq > ? ORDER BY seq",
+            (since,)
+        ).fetchall()
+        deleted, latest = _deleted_since(db, since)
+    latest = max([latest] + [row['seq'] for row in rows])
+    return [json.loads(row['data']) for row in rows], deleted, latest
+
+
+def list_names(kind):
+    rows = get_db().execute(
+        "SELECT name FROM lists WHERE kind = ? ORDER BY name", (kind,)
+    ).fetchall()
+    return [row['name'] for row in rows]
+
+
+def areas():
+    return list_names('area')
+
+
+def ingredients():
+    return list_names('ingredient')
+
+
+# Nomes dos países em português (usados pelo registro de países)
+
+def load_area_labels():
+    rows = get_db().execute("SELECT en, pt, updated_at FROM area_labels").fetchall()
+    updated_at = min((row['updated_at'] for row in rows), default=0)
+    return {row['en']: row['pt'] for row in rows}, updated_at
+
+
+def save_area_labels(labels):
+    db = get_db()
+    now = time.time()
+    with db:
+        db.execute("DELETE FROM area_labels")
+        db.executemany("INSERT INTO area_labels (en, pt, updated_at) VALUES (?, ?, ?)",
+                       [(en, pt, now) for en, pt in labels.items()])
+
+
+# Sincronização em segundo plano
+
+_sync_thread = None
+_sync_lock = threading.Lock()
+
+
+def _sync_loop(max_age, pause):
+    while True:
+        keys = stale_keys(max_age)
+        for key in keys:
+            try:
+                sync_key(key)
+            except Exception:
+                pass
+            # Pequena pausa entre chamadas para não estourar o limite da API
+            time.sleep(pause)
+        if not keys:
+            time.sleep(min(max_age, 60))
+
+
+# Função para iniciar a sincronização (uma única thread por processo)
+def start_background_sync(max_age=SYNC_INTERVAL, pause=1.0):
+    global _sync_thread
+    with _sync_lock:
+        if _sync_thread is None or not _sync_thread.is_alive():
+            _sync_thread = threading.Thread(
+                target=_sync_loop, args=(max_age, pause), name="catalog-sync", daemon=True
+            )
+            _sync_thread.start()
+    return _sync_thread
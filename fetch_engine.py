@@ -0,0 +1,171 @@
+import asyncio
+import atexit
+import os
+import queue
+import threading
+
+import aiohttp
+
+import mealdb
+import metrics
+
+# Motor de requisições assíncrono (asyncio + aiohttp) rodando em uma thread
+# própria, com conexões reaproveitadas (keep-alive), limite global e por host
+# e cancelamento. O Streamlit é síncrono, então o motor expõe geradores que
+# entregam cada resposta assim que ela chega. Cache, requisições em andamento,
+# política de novas tentativas e disjuntor são os da camada HTTP síncrona
+# (mealdb): uma URL pedida ao mesmo tempo pelos dois lados vai à rede uma vez.
+
+CONCURRENCY = int(os.environ.get("RECEITA_FETCH_CONCURRENCY", "20"))
+PER_HOST = int(os.environ.get("RECEITA_FETCH_PER_HOST", "10"))
+TIMEOUT = mealdb.TIMEOUT
+
+
+class FetchEngine:
+    def __init__(self, concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self._session = None
+        self._semaphore = None
+        # url -> (chamada, tarefa que faz a requisição); só é acessado no loop
+        self._tasks = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fetch-engine", daemon=True)
+        self._thread.start()
+
+    async def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency, limit_per_host=self.per_host, keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _get(self, url):
+        session = await self._get_session()
+        async with self._semaphore:
+            try:
+                async with session.get(url) as response:
+                    if response.status >= 400:
+                        return response.status, None
+                    try:
+                        return response.status, await response.json(content_type=None)
+                    except ValueError:
+                        return response.status, None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return None, None
+
+    # Mesma política de novas tentativas de mealdb._request, sem bloquear o loop
+    async def _request(self, url):
+        policy = mealdb.retry_policy()
+        try:
+            action, delay = next(policy)
+            while True:
+                if action == 'sleep':
+                    await asyncio.sleep(delay)
+                    action, delay = policy.send(None)
+                else:
+                    action, delay = policy.send(await self._get(url))
+        except StopIteration as stop:
+            return stop.value
+
+    async def _lead(self, url, call):
+        data, store = None, False
+        try:
+            data, store = await self._request(url)
+        finally:
+            mealdb.finish_call(url, call, data, store)
+        return data
+
+    # Buscas da mesma URL feitas ao mesmo tempo (por sessões diferentes ou
+    # por chamadas síncronas) compartilham uma única requisição, cancelada só
+    # quando ninguém mais a espera
+    async def _fetch_json(self, url):
+        call, leader = mealdb.join_call(url)
+        task = None
+        try:
+            if leader:
+                task = asyncio.ensure_future(self._lead(url, call))
+                entry = self._tasks[url] = (call, task)
+                task.add_done_callback(lambda _: self._tasks.get(url) is entry and self._tasks.pop(url))
+            elif url in self._tasks and self._tasks[url][0] is call:
+                task = self._tasks[url][1]
+            if task is None:
+                # Quem faz a requisição é uma chamada síncrona (outra thread)
+                while not call.done.is_set():
+                    await asyncio.sleep(0.02)
+                return call.data
+            return await asyncio.shield(task)
+        finally:
+            if mealdb.leave_call(call) == 0 and task is not None and not task.done():
+                task.cancel()
+
+    # Função para buscar várias URLs, entregando (url, json) na ordem em que
+    # as respostas chegam. Respostas já em cache são entregues primeiro. Se o
+    # gerador for fechado antes do fim (ou cancel for sinalizado), as
+    # requisições pendentes são canceladas.
+    def fetch_many(self, urls, cancel=None):
+        urls = list(dict.fromkeys(urls))
+        pending_urls = []
+        for url in urls:
+            found, cached = mealdb.cache_lookup(url)
+            if found:
+                metrics.count('http.cache_hits')
+                yield url, cached
+            else:
+                pending_urls.append(url)
+        metrics.count('http.fetches', len(pending_urls))
+
+        done = queue.Queue()
+        futures = []
+        for url in pending_urls:
+            future = asyncio.run_coroutine_threadsafe(self._fetch_json(url), self._loop)
+            future.add_done_callback(lambda f, url=url: done.put((url, f)))
+            futures.append(future)
+
+        try:
+            for _ in futures:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    try:
+                        url, future = done.get(timeout=0.1)
+                        break
+                    except queue.Empty:
+                        continue
+                if future.cancelled() or future.exception() is not None:
+                    yield url, None
+                    continue
+                yield url, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    # Função para buscar várias URLs e devolver {url: json} quando todas chegarem
+    def fetch_all(self, urls, cancel=None):
+        return dict(self.fetch_many(urls, cancel=cancel))
+
+    def close(self):
+        async def _close():
+            if self._session is not None:
+                await self._session.close()
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# Motor único por processo (as reexecuções do Streamlit reaproveitam o pool)
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+            atexit.register(_engine.close)
+    return _engine
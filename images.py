@@ -0,0 +1,193 @@
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from PIL import Image
+
+import metrics
+
+# Imagens das receitas: cache em disco (endereçado pelo conteúdo) das imagens
+# já redimensionadas, revalidação condicional (ETag/Last-Modified), cache em
+# memória dos bytes prontos e pré-carregamento paralelo.
+
+CACHE_DIR = os.environ.get("RECEITA_IMAGE_CACHE", ".image_cache")
+# Depois desse tempo (segundos) a imagem é revalidada no servidor
+REVALIDATE_AFTER = int(os.environ.get("RECEITA_IMAGE_REVALIDATE", "86400"))
+# Limite de bytes guardados em memória
+MEMORY_BUDGET = int(os.environ.get("RECEITA_IMAGE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+PREFETCH_WORKERS = 8
+TIMEOUT = 10
+
+session = requests.Session()
+session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=PREFETCH_WORKERS))
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=PREFETCH_WORKERS))
+
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="image")
+
+
+# Cache em memória (LRU limitado por bytes)
+class ByteLRU:
+    def __init__(self, budget):
+        self.budget = budget
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.budget and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+_memory = ByteLRU(MEMORY_BUDGET)
+# Última verificação de cada URL, para servir o cache em memória sem ler os
+# metadados do disco a cada execução da página
+_checked_at = {}
+# Uma trava por URL evita baixar a mesma imagem duas vezes ao mesmo tempo
+_url_locks = {}
+_url_locks_lock = threading.Lock()
+
+
+def _url_lock(url):
+    with _url_locks_lock:
+        return _url_locks.setdefault(url, threading.Lock())
+
+
+def _meta_path(url):
+    return os.path.join(CACHE_DIR, "meta", hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+
+def _blob_path(digest, width):
+    return os.path.join(CACHE_DIR, "blobs", digest[:2], f"{digest}_{width}.jpg")
+
+
+def _read_meta(url):
+    try:
+        with open(_meta_path(url), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_meta(url, meta):
+    _write_file(_meta_path(url), json.dumps(meta).encode('utf-8'))
+
+
+def _original_path(digest):
+    return os.path.join(CACHE_DIR, "blobs", digest[:2], f"{digest}.orig")
+
+
+# Função para redimensionar (mantendo a proporção) e codificar em JPEG
+def resize_image(content, width):
+    img = Image.open(io.BytesIO(content))
+    if img.width > width:
+        img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=85, optimize=True)
+    return output.getvalue()
+
+
+# Função para baixar (ou revalidar) a imagem original. Devolve os metadados
+# atualizados ou None se não houver imagem disponível.
+def _fetch_original(url, meta):
+    headers = {}
+    if meta:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    metrics.count('images.requests')
+    try:
+        response = session.get(url, headers=headers, timeout=TIMEOUT)
+    except requests.exceptions.RequestException:
+        # Sem rede: continua usando a versão em disco, se houver
+        return meta
+
+    if response.status_code == 304 and meta:
+        meta['checked_at'] = time.time()
+        _write_meta(url, meta)
+        return meta
+    if response.status_code != 200 or not response.content:
+        return meta
+
+    digest = hashlib.sha256(response.content).hexdigest()
+    if not os.path.exists(_original_path(digest)):
+        _write_file(_original_path(digest), response.content)
+    meta = {
+        'digest': digest,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'checked_at': time.time(),
+    }
+    _write_meta(url, meta)
+    return meta
+
+
+# Função para obter a imagem de uma receita já redimensionada (bytes JPEG)
+def get_image(url, width):
+    if not url:
+        return None
+    key = (url, width)
+    data = _memory.get(key)
+    if data is not None and time.time() - _checked_at.get(url, 0) < REVALIDATE_AFTER:
+        metrics.count('images.memory_hits')
+        return data
+
+    with _url_lock(url):
+        meta = _read_meta(url)
+        if not (meta and time.time() - meta.get('checked_at', 0) < REVALIDATE_AFTER):
+            meta = _fetch_original(url, meta)
+        if not meta:
+            return None
+
+        blob_path = _blob_path(meta['digest'], width)
+        try:
+            with open(blob_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            try:
+                with open(_original_path(meta['digest']), 'rb') as f:
+                    original = f.read()
+                data = resize_image(original, width)
+            except (OSError, ValueError):
+                return None
+            _write_file(blob_path, data)
+
+    _memory.put(key, data)
+    _checked_at[url] = meta.get('checked_at', 0)
+    return data
+
+
+# Função para pré-carregar imagens em paralelo (não bloqueia)
+def prefetch(urls, width):
+    return [_executor.submit(get_image, url, width) for url in dict.fromkeys(urls) if url]
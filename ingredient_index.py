@@ -0,0 +1,181 @@
+import re
+import threading
+import time
+import unicodedata
+
+import catalog
+import mealdb
+import translation_cache
+
+# Índice de ingredientes: cada ingrediente canônico (nome em inglês do
+# TheMealDB) recebe um id inteiro e o usuário vira um bitset (int) de ids: um
+# ingrediente da receita é compatível se o seu bit estiver no bitset. Sinônimos
+# em português vêm do glossário e das traduções feitas durante as buscas.
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+# Plurais (inglês e português) mais comuns; aplicados aos dois lados da busca
+_PLURAL_RULES = (
+    ('ões', 'ão'), ('ães', 'ão'), ('ãos', 'ão'),
+    ('ies', 'y'), ('oes', 'o'), ('shes', 'sh'), ('ches', 'ch'), ('xes', 'x'),
+)
+# Palavras que não identificam o ingrediente
+_STOPWORDS = {'de', 'da', 'do', 'das', 'dos', 'e', 'of', 'and', 'the', 'a', 'o'}
+# Ingredientes compostos: quem tem estas palavras é outro ingrediente
+# ("Chicken Stock" não é frango, "Red Pepper" é pimentão e não pimenta) e
+# só entra na busca se ela também tiver as palavras
+_COMPOUNDS = (
+    ('stock',), ('broth',), ('sauce',), ('powder',), ('paste',), ('cube',), ('extract',),
+    ('essence',), ('oil',), ('flake',), ('coconut', 'milk'),
+    ('red', 'pepper'), ('green', 'pepper'), ('yellow', 'pepper'), ('bell', 'pepper'),
+)
+# Nova tentativa de montar o índice, se o catálogo ainda estiver vazio
+RETRY_AFTER = 60
+
+
+def _fold(text):
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+# Função para reduzir uma palavra ao singular
+def stem(word):
+    if len(word) > 3:
+        for suffix, replacement in _PLURAL_RULES:
+            if word.endswith(suffix):
+                return word[:-len(suffix)] + replacement
+        if word.endswith('s') and not word.endswith('ss'):
+            return word[:-1]
+    return word
+
+
+# Função para normalizar um nome em palavras sem plural e sem acento
+def tokens(name):
+    words = _TOKEN_RE.findall((name or '').lower())
+    return tuple(_fold(stem(word)) for word in words if word not in _STOPWORDS)
+
+
+class IngredientIndex:
+    def __init__(self, names=(), synonyms=()):
+        self.names = []        # id -> nome canônico
+        self._ids = {}         # tokens -> id
+        self._token_masks = {}  # palavra -> bitset dos ids que a contêm
+        self._synonyms = {}    # tokens em português -> tokens em inglês
+        self._lock = threading.Lock()
+        for name in names:
+            self.ingredient_id(name)
+        for pt, en in synonyms:
+            self.add_synonym(pt, en)
+
+    # Função para obter (ou criar) o id de um ingrediente
+    def ingredient_id(self, name):
+        key = tokens(name)
+        if not key:
+            return None
+        ingredient_id = self._ids.get(key)
+        if ingredient_id is None:
+            with self._lock:
+                ingredient_id = self._ids.get(key)
+                if ingredient_id is None:
+                    ingredient_id = len(self.names)
+                    self.names.append(name)
+                    self._ids[key] = ingredient_id
+                    for word in set(key):
+                        self._token_masks[word] = self._token_masks.get(word, 0) | (1 << ingredient_id)
+        return ingredient_id
+
+    def add_synonym(self, pt, en):
+        pt_key, en_key = tokens(pt), tokens(en)
+        if pt_key and en_key:
+            self._synonyms[pt_key] = en_key
+
+    # Bitset dos ingredientes que contêm todas as palavras
+    def _with_words(self, words):
+        mask = -1
+        for word in words:
+            mask &= self._token_masks.get(word, 0)
+            if not mask:
+                return 0
+        return mask
+
+    # Função para obter o bitset de todos os ingredientes que contêm as
+    # palavras informadas ("chicken" -> chicken, chicken breast, ...), sem os
+    # compostos que a busca não pediu ("chicken stock")
+    def _mask_for(self, key):
+        if not key:
+            return 0
+        mask = self._with_words(key)
+        words = set(key)
+        for compound in _COMPOUNDS:
+            if mask and not words.issuperset(compound):
+                mask &= ~self._with_words(compound)
+        return mask
+
+    # Função para resolver um termo digitado pelo usuário (em português ou
+    # inglês). Usa o sinônimo conhecido ou, se não houver, a tradução.
+    # Retorna (nome em inglês para a API, bitset).
+    def resolve(self, term, translate=None):
+        english = None
+        key = tokens(term)
+        en_key = self._synonyms.get(key)
+        if en_key is None and self._ids.get(key) is not None:
+            en_key = key
+        if en_key is None and translate is not None:
+            english = translate(term)
+            en_key = tokens(english)
+            self.add_synonym(term, english)
+        if en_key is None:
+            en_key = key
+
+        exact = self._ids.get(en_key)
+        if exact is not None:
+            english = self.names[exact]
+        elif english is None:
+            english = ' '.join(en_key) or term
+        return english, self._mask_for(en_key)
+
+    # Ids dos ingredientes de uma receita, na ordem em que aparecem
+    def recipe_ids(self, ingredients):
+        return [self.ingredient_id(ingredient) for ingredient in ingredients]
+
+    # Bitset dos ids de uma receita (a lista devolvida por recipe_ids)
+    @staticmethod
+    def recipe_mask(ingredient_ids):
+        mask = 0
+        for ingredient_id in ingredient_ids:
+            if ingredient_id is not None:
+                mask |= 1 << ingredient_id
+        return mask
+
+
+# Índice único por processo
+
+_index = None
+_index_complete = False
+_index_built_at = 0
+_index_lock = threading.Lock()
+
+
+def _load_names():
+    names = catalog.ingredients()
+    if not names:
+        data = mealdb.cached_api_request(mealdb.api_url("list.php", i="list"))
+        names = [item['strIngredient'] for item in (data or {}).get('meals') or [] if item.get('strIngredient')]
+    return names
+
+
+def build_index(names=None):
+    try:
+        synonyms = [(pt, en) for en, pt in translation_cache.read_glossary()]
+    except OSError:
+        synonyms = []
+    return IngredientIndex(_load_names() if names is None else names, synonyms)
+
+
+def get_index():
+    global _index, _index_complete, _index_built_at
+    with _index_lock:
+        if _index is None or (not _index_complete and time.time() - _index_built_at > RETRY_AFTER):
+            names = _load_names()
+            _index = build_index(names)
+            _index_complete = bool(names)
+            _index_built_at = time.time()
+    return _index
@@ -0,0 +1,287 @@
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import requests
+
+import metrics
+
+# Endereço base da API. Pode apontar para um servidor local de testes
+# (ex: MEALDB_API_BASE=http://127.0.0.1:8000) para rodar sem internet.
+API_BASE = os.environ.get("MEALDB_API_BASE", "https://www.themealdb.com/api/json/v1/1").rstrip('/')
+
+# Camada HTTP compartilhada: cache com validade (respostas boas e falhas têm
+# prazos diferentes), requisições iguais em andamento são feitas uma vez só,
+# novas tentativas com espera aleatória e um disjuntor que para de chamar a
+# API por um tempo quando ela está fora do ar.
+TIMEOUT = float(os.environ.get("RECEITA_FETCH_TIMEOUT", "10"))
+POOL_SIZE = int(os.environ.get("RECEITA_FETCH_CONCURRENCY", "20"))
+POSITIVE_TTL = float(os.environ.get("RECEITA_HTTP_TTL", "3600"))
+NEGATIVE_TTL = float(os.environ.get("RECEITA_HTTP_NEGATIVE_TTL", "30"))
+RETRIES = int(os.environ.get("RECEITA_HTTP_RETRIES", "2"))
+BACKOFF = float(os.environ.get("RECEITA_HTTP_BACKOFF", "0.3"))
+BREAKER_THRESHOLD = int(os.environ.get("RECEITA_HTTP_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("RECEITA_HTTP_BREAKER_COOLDOWN", "30"))
+
+# Respostas que indicam falha passageira do servidor
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+session = requests.Session()
+session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=POOL_SIZE))
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=POOL_SIZE))
+
+
+# Função para montar a URL de um endpoint da API
+def api_url(endpoint, **params):
+    url = f"{API_BASE}/{endpoint}"
+    if params:
+        url += "?" + urlencode(params)
+    return url
+
+
+# Contadores da camada HTTP
+_metrics = dict.fromkeys(
+    ('hits', 'negative_hits', 'misses', 'coalesced', 'requests', 'retries', 'failures', 'short_circuited'), 0
+)
+_metrics_lock = threading.Lock()
+
+
+def count(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+# Disjuntor: depois de BREAKER_THRESHOLD falhas seguidas fica aberto por
+# BREAKER_COOLDOWN segundos; depois disso deixa passar uma tentativa
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Meio aberto: uma tentativa passa; as outras falham na hora até
+                # ela dar certo (fecha) ou até o fim de um novo intervalo
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self._lock:
+            return 'closed' if self.opened_at is None else 'open'
+
+
+breaker = CircuitBreaker()
+
+
+# Espera antes da próxima tentativa (backoff exponencial com jitter completo)
+def backoff_delay(attempt):
+    return random.uniform(0, BACKOFF * 2 ** attempt)
+
+
+# Indica se vale tentar de novo (status None = erro de rede ou timeout)
+def retryable(status):
+    return status is None or status in RETRY_STATUS
+
+
+# Cache para requisições de API (compartilhado com o motor assíncrono).
+# Falhas também ficam guardadas (como None), mas por pouco tempo.
+CACHE_SIZE = 500
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# Função para consultar o cache. Retorna (encontrado, dados); dados None
+# indica uma falha recente.
+def cache_lookup(url):
+    with _cache_lock:
+        entry = _cache.get(url)
+        if entry is not None and entry[1] <= time.monotonic():
+            del _cache[url]
+            entry = None
+        if entry is not None:
+            _cache.move_to_end(url)
+    if entry is None:
+        count('misses')
+        return False, None
+    count('hits' if entry[0] is not None else 'negative_hits')
+    return True, entry[0]
+
+
+def cache_get(url):
+    return cache_lookup(url)[1]
+
+
+def cache_clear():
+    with _cache_lock:
+        _cache.clear()
+
+
+def cache_put(url, data, ttl=None):
+    if ttl is None:
+        ttl = POSITIVE_TTL if data is not None else NEGATIVE_TTL
+    with _cache_lock:
+        _cache[url] = (data, time.monotonic() + ttl)
+        _cache.move_to_end(url)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+# Política de novas tentativas, a mesma para as requisições síncronas
+# (_request) e as do motor assíncrono (fetch_engine). O gerador pede
+# ('get', None), recebendo (status, dados), ou ('sleep', segundos), e termina
+# com (dados, guardar): falhas reais vão para o cache negativo, mas chamadas
+# barradas pelo disjuntor não. Status None = erro de rede ou timeout.
+def retry_policy():
+    for attempt in range(RETRIES + 1):
+        if not breaker.allow():
+            count('short_circuited')
+            return None, False
+        if attempt:
+            count('retries')
+        count('requests')
+        status, data = yield 'get', None
+
+        if data is not None:
+            breaker.record_success()
+            return data, True
+        if not retryable(status):
+            breaker.record_success()
+            break
+        breaker.record_failure()
+        if attempt < RETRIES:
+            yield 'sleep', backoff_delay(attempt)
+    count('failures')
+    return None, True
+
+
+def _get(url):
+    try:
+        response = session.get(url, timeout=TIMEOUT)
+    except requests.exceptions.RequestException:
+        return None, None
+    if response.status_code >= 400:
+        return response.status_code, None
+    try:
+        return response.status_code, response.json()
+    except ValueError:
+        return response.status_code, None
+
+
+# Função para fazer a requisição com novas tentativas. Retorna (dados, guardar).
+def _request(url):
+    policy = retry_policy()
+    try:
+        action, delay = next(policy)
+        while True:
+            if action == 'sleep':
+                time.sleep(delay)
+                action, delay = policy.send(None)
+            else:
+                action, delay = policy.send(_get(url))
+    except StopIteration as stop:
+        return stop.value
+
+
+# Requisições em andamento, por URL, compartilhadas pelas chamadas síncronas
+# e pelo motor assíncrono: quem pede uma URL já em andamento espera pela
+# mesma resposta
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None
+        self.waiters = 1  # interessados (síncronos e assíncronos)
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+# Entra na requisição em andamento da URL ou abre uma nova.
+# Retorna (chamada, é a primeira).
+def join_call(url):
+    with _inflight_lock:
+        call = _inflight.get(url)
+        if call is None:
+            call = _inflight[url] = Call()
+            return call, True
+        call.waiters += 1
+    count('coalesced')
+    metrics.count('http.coalesced')
+    return call, False
+
+
+# Deixa de esperar pela chamada. Retorna quantos ainda esperam.
+def leave_call(call):
+    with _inflight_lock:
+        call.waiters -= 1
+        return call.waiters
+
+
+# Entrega o resultado da chamada a quem espera (e ao cache, se for o caso)
+def finish_call(url, call, data, store):
+    if store:
+        cache_put(url, data)
+    call.data = data
+    with _inflight_lock:
+        if _inflight.get(url) is call:
+            del _inflight[url]
+    call.done.set()
+
+
+def cached_api_request(url):
+    found, data = cache_lookup(url)
+    if found:
+        metrics.count('http.cache_hits')
+        return data
+
+    call, leader = join_call(url)
+    try:
+        if not leader:
+            call.done.wait()
+            return call.data
+
+        metrics.count('http.fetches')
+        data, store = None, False
+        try:
+            data, store = _request(url)
+        finally:
+            finish_call(url, call, data, store)
+        return data
+    finally:
+        leave_call(call)
+
+
+# Função para buscar um endpoint sem cache (usada na sincronização do catálogo)
+def fetch_json(endpoint, **params):
+    return _request(api_url(endpoint, **params))[0]
+
+
+def stats():
+    with _metrics_lock:
+        result = dict(_metrics)
+    with _cache_lock:
+        result['cache_entries'] = len(_cache)
+    result['breaker'] = breaker.state
+    return result
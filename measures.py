@@ -0,0 +1,149 @@
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Normalização das medidas dos ingredientes ("1 1/2 cups", "200g", "2 tbsp
+# chopped"): uma única expressão regular compilada, com limites de palavra,
+# separa quantidade, unidade e o restante do texto.
+
+# Mostra a conversão métrica ao lado das medidas americanas/imperiais
+METRIC = os.environ.get("RECEITA_METRIC_UNITS", "0") == "1"
+
+# amount: quantidade como escrita ("1 1/2"); quantity: valor numérico;
+# unit: unidade canônica (chave de UNITS); text: restante da medida
+Measure = namedtuple('Measure', 'amount quantity unit text')
+
+# unidade canônica: (apelidos em inglês, singular pt, plural pt, conversão métrica)
+UNITS = {
+    'tbsp': (('tablespoons', 'tablespoon', 'tblsp', 'tbsp', 'tbls', 'tbs'),
+             'colher de sopa', 'colheres de sopa', (15, 'ml')),
+    'tsp': (('teaspoons', 'teaspoon', 'tspn', 'tsp'),
+            'colher de chá', 'colheres de chá', (5, 'ml')),
+    'cup': (('cups', 'cup'), 'xícara', 'xícaras', (240, 'ml')),
+    'oz': (('ounces', 'ounce', 'oz'), 'onça', 'onças', (28.35, 'g')),
+    'lb': (('pounds', 'pound', 'lbs', 'lb'), 'libra', 'libras', (453.6, 'g')),
+    'pint': (('pints', 'pint'), 'pint', 'pints', (473, 'ml')),
+    'kg': (('kilograms', 'kilogram', 'kg'), 'kg', 'kg', None),
+    'g': (('grams', 'gram', 'gr', 'g'), 'g', 'g', None),
+    'ml': (('millilitres', 'milliliters', 'ml'), 'ml', 'ml', None),
+    'l': (('litres', 'liters', 'litre', 'liter', 'l'), 'litro', 'litros', None),
+    'pinch': (('pinches', 'pinch'), 'pitada', 'pitadas', None),
+    'clove': (('cloves', 'clove'), 'dente', 'dentes', None),
+    'can': (('cans', 'can', 'tins', 'tin'), 'lata', 'latas', None),
+    'slice': (('slices', 'slice'), 'fatia', 'fatias', None),
+    'handful': (('handfuls', 'handful'), 'punhado', 'punhados', None),
+}
+
+_PLURAL_ALIASES = {
+    'tablespoons', 'teaspoons', 'cups', 'ounces', 'pounds', 'lbs', 'pints', 'kilograms', 'grams',
+    'millilitres', 'milliliters', 'litres', 'liters', 'pinches', 'cloves', 'cans', 'tins',
+    'slices', 'handfuls',
+}
+_ALIASES = {alias: unit for unit, (aliases, _, _, _) in UNITS.items() for alias in aliases}
+# Apelidos mais longos primeiro: "tbsp" não pode ser capturado como "tbs"
+_UNIT_PATTERN = '|'.join(sorted(map(re.escape, _ALIASES), key=len, reverse=True))
+
+_FRACTIONS = {'½': 0.5, '¼': 0.25, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3, '⅛': 0.125}
+
+_MEASURE_RE = re.compile(
+    r'^\s*(?P<amount>\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?(?:\s*-\s*\d+(?:[.,]\d+)?)?\s*[½¼¾⅓⅔⅛]?|[½¼¾⅓⅔⅛])?'
+    r'\s*(?:(?P<unit>' + _UNIT_PATTERN + r')\b\.?)?\s*(?P<text>.*?)\s*$',
+    re.IGNORECASE | re.DOTALL
+)
+_UNIT_RE = re.compile(r'\b(' + _UNIT_PATTERN + r')\b\.?', re.IGNORECASE)
+
+
+# Pares (unidade em inglês, nome em português) para o glossário de tradução
+def unit_glossary():
+    return [(alias, unit_label(unit, plural=alias in _PLURAL_ALIASES)) for alias, unit in _ALIASES.items()]
+
+
+# Função para converter a quantidade escrita em número
+def parse_amount(amount):
+    if not amount:
+        return None
+    # Em intervalos ("2-3") vale o primeiro número
+    amount = amount.strip().replace(',', '.').split('-')[0]
+    total = 0.0
+    for part in amount.split():
+        if part[-1] in _FRACTIONS:
+            total += _FRACTIONS[part[-1]]
+            part = part[:-1]
+            if not part:
+                continue
+        if '/' in part:
+            numerator, denominator = part.split('/')
+            total += int(numerator) / int(denominator) if int(denominator) else 0
+        else:
+            total += float(part)
+    return total
+
+
+# Função para separar quantidade, unidade e texto de uma medida em inglês
+# (as mesmas medidas se repetem muito entre receitas, daí o cache)
+@lru_cache(maxsize=4096)
+def parse_measure(text):
+    match = _MEASURE_RE.match(text or '')
+    if match is None:
+        return Measure(None, None, None, (text or '').strip())
+    amount = (match.group('amount') or '').strip()
+    unit = match.group('unit')
+    if unit and not amount and match.group('text'):
+        # "l" ou "g" soltos no início de uma palavra não são unidades
+        unit = None
+        rest = text.strip()
+    else:
+        rest = match.group('text')
+    return Measure(amount or None, parse_amount(amount), _ALIASES[unit.lower()] if unit else None, rest)
+
+
+def _is_plural(measure):
+    return measure.quantity is not None and measure.quantity > 1
+
+
+def unit_label(unit, plural=False):
+    _, singular, plural_label, _ = UNITS[unit]
+    return plural_label if plural else singular
+
+
+# Função para converter a medida para o sistema métrico (g/ml), se possível
+def to_metric(measure):
+    if measure.unit is None or measure.quantity is None:
+        return None
+    conversion = UNITS[measure.unit][3]
+    if conversion is None:
+        return None
+    factor, metric_unit = conversion
+    value = measure.quantity * factor
+    return Measure(f"{value:.0f}", value, metric_unit, measure.text)
+
+
+# Função para trocar, em uma única passada, as unidades em inglês de um texto
+# livre pelos nomes em português
+def normalize_units(text):
+    def replace(match):
+        alias = match.group(1).lower()
+        return unit_label(_ALIASES[alias], plural=alias in _PLURAL_ALIASES)
+    return _UNIT_RE.sub(replace, text)
+
+
+# Função para montar a medida em português. text_pt é o restante da medida
+# já traduzido; com metric=True a conversão métrica vai entre parênteses.
+def to_portuguese(measure, text_pt=None, metric=None):
+    metric = METRIC if metric is None else metric
+    parts = []
+    if measure.amount:
+        parts.append(measure.amount)
+    if measure.unit:
+        parts.append(unit_label(measure.unit, _is_plural(measure)))
+    text = measure.text if text_pt is None else text_pt
+    if text:
+        parts.append(normalize_units(text))
+    result = ' '.join(parts)
+
+    if metric:
+        converted = to_metric(measure)
+        if converted is not None:
+            result += f" (≈{converted.amount} {converted.unit})"
+    return result
@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Instrumentação da busca e da exibição: cada busca (trace) é dividida em
+# etapas (spans) com duração e contadores (requisições, acertos de cache,
+# traduções...). Desligada por padrão; desligada, span() devolve sempre o
+# mesmo contexto vazio e count() retorna na primeira linha.
+#   RECEITA_METRICS=1            liga a instrumentação (e o painel na barra lateral)
+#   RECEITA_METRICS_FILE=x.jsonl grava cada busca em JSON lines (.prom: texto Prometheus)
+#   RECEITA_METRICS_PORT=9108    serve /metrics (Prometheus) e /traces (JSON lines)
+
+ENABLED = os.environ.get("RECEITA_METRICS", "0") == "1"
+EXPORT_FILE = os.environ.get("RECEITA_METRICS_FILE")
+EXPORT_PORT = int(os.environ.get("RECEITA_METRICS_PORT", "0"))
+# Buscas recentes guardadas em memória (painel e /traces)
+RECENT = 50
+# Limites (em segundos) dos baldes do histograma de duração das etapas
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_NOOP = nullcontext()
+_local = threading.local()
+
+
+class Span:
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+        self.counts = Counter()
+        self.start = 0.0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.trace.stack.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self.start
+        self.trace.stack.pop()
+        self.trace.spans.append(self)
+        _registry.observe(self.name, self.duration)
+        return False
+
+    def as_dict(self):
+        return {'name': self.name, 'start_ms': round((self.start - self.trace.start) * 1000, 3),
+                'ms': round(self.duration * 1000, 3), 'counts': dict(self.counts)}
+
+
+class Trace:
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.spans = []
+        self.stack = []
+        self.counts = Counter()
+        self.start = 0.0
+        self.duration = 0.0
+        self._parent = None
+
+    def __enter__(self):
+        self._parent = getattr(_local, 'trace', None)
+        _local.trace = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self.start
+        _local.trace = self._parent
+        _registry.finish(self)
+        return False
+
+    def as_dict(self):
+        return {'trace': self.name, 'ts': time.time(), 'ms': round(self.duration * 1000, 3),
+                'attrs': self.attrs, 'counts': dict(self.counts),
+                'spans': [span.as_dict() for span in sorted(self.spans, key=lambda span: span.start)]}
+
+
+# Agregados do processo (todas as sessões): histogramas por etapa e contadores
+class Registry:
+    def __init__(self):
+        self.stages = {}  # nome -> [baldes..., soma, quantidade]
+        self.counts = Counter()
+        self.recent = deque(maxlen=RECENT)
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stage[i] += 1
+            stage[-2] += seconds
+            stage[-1] += 1
+
+    def add(self, name, amount):
+        with self._lock:
+            self.counts[name] += amount
+
+    def finish(self, trace):
+        self.observe(f"trace:{trace.name}", trace.duration)
+        record = trace.as_dict()
+        with self._lock:
+            self.recent.append(record)
+        if EXPORT_FILE:
+            _export(record)
+
+    def prometheus(self):
+        lines = ['# TYPE receita_stage_seconds histogram']
+        with self._lock:
+            stages = {name: list(values) for name, values in self.stages.items()}
+            counts = dict(self.counts)
+        for name, values in sorted(stages.items()):
+            for bound, value in zip(BUCKETS, values):
+                lines.append(f'receita_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {value}')
+            lines.append(f'receita_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {values[-1]}')
+            lines.append(f'receita_stage_seconds_sum{{stage="{name}"}} {values[-2]:.6f}')
+            lines.append(f'receita_stage_seconds_count{{stage="{name}"}} {values[-1]}')
+        lines.append('# TYPE receita_events_total counter')
+        for name, value in sorted(counts.items()):
+            lines.append(f'receita_events_total{{event="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def recent_jsonl(self):
+        with self._lock:
+            return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in self.recent)
+
+
+_registry = Registry()
+_export_lock = threading.Lock()
+
+
+def _export(record):
+    try:
+        with _export_lock:
+            if EXPORT_FILE.endswith('.prom'):
+                # Arquivo lido por um coletor (ex: textfile do node_exporter)
+                tmp_path = EXPORT_FILE + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(_registry.prometheus())
+                os.replace(tmp_path, EXPORT_FILE)
+            else:
+                with open(EXPORT_FILE, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+
+# Função para iniciar uma busca instrumentada
+def trace(name, **attrs):
+    if not ENABLED:
+        return _NOOP
+    _start_server()
+    return Trace(name, **attrs)
+
+
+# Função para medir uma etapa da busca atual (fora de uma busca não mede)
+def span(name):
+    if not ENABLED:
+        return _NOOP
+    current = getattr(_local, 'trace', None)
+    if current is None:
+        return _NOOP
+    return Span(name, current)
+
+
+# Função para contar um evento na etapa e na busca atuais
+def count(name, amount=1):
+    if not ENABLED or not amount:
+        return
+    _registry.add(name, amount)
+    current = getattr(_local, 'trace', None)
+    if current is not None:
+        current.counts[name] += amount
+        if current.stack:
+            current.stack[-1].counts[name] += amount
+
+
+# Servidor local de métricas (um por processo)
+
+_server = None
+_server_lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith('/metrics'):
+            body, content_type = _registry.prometheus(), 'text/plain; version=0.0.4'
+        elif self.path.startswith('/traces'):
+            body, content_type = _registry.recent_jsonl(), 'application/x-ndjson'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _start_server():
+    global _server
+    if not EXPORT_PORT or _server is not None:
+        return
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(('127.0.0.1', EXPORT_PORT), _Handler)
+            except OSError:
+                # Porta ocupada (ex: outro processo do Streamlit já exporta)
+                _server = False
+                return
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
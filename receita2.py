@@ -1,223 +1,130 @@
 import streamlit as st
 import requests
-from PIL import Image
-import io
-from deep_translator import GoogleTranslator 
-import concurrent.futures
-import time
-from functools import lru_cache
-
-# Configuração do tradutor com cache
-@lru_cache(maxsize=1000)
-def cached_translator_pt_en(text):
-    return GoogleTranslator(source='pt', target='en').translate(text)
-
-@lru_cache(maxsize=1000)
-def cached_translator_en_pt(text):
-    return GoogleTranslator(source='en', target='pt').translate(text)
-
-translator_pt_en = cached_translator_pt_en
-translator_en_pt = cached_translator_en_pt
-
-session = requests.Session()
-
-# Cache para requisições de API
-@lru_cache(maxsize=500)
-def cached_api_request(url):
+import os
+import threading
+
+import areas
+import catalog
+import images
+import mealdb
+import metrics
+import recipe_cache
+import recipes as recipes_mod
+import recommend
+import search
+import snapshot
+import text_index
+import translators
+import warmer
+
+# Larguras das imagens (resultado da busca, país e receita selecionada)
+IMAGE_WIDTH_RESULT = 240
+IMAGE_WIDTH_COUNTRY = 300
+IMAGE_WIDTH_SELECTED = 350
+
+# Receitas por página na navegação por país
+AREA_PAGE_SIZE = int(os.environ.get("RECEITA_AREA_PAGE_SIZE", "5"))
+# Pré-carrega a próxima página de receitas do país
+AREA_PREFETCH = os.environ.get("RECEITA_AREA_PREFETCH", "1") == "1"
+# Resultados da busca por nome na barra lateral
+TEXT_SEARCH_RESULTS = 8
+
+# Função para traduzir, em um único lote, as receitas prestes a serem exibidas
+def translate_for_display(recipes):
     try:
-        response = session.get(url, timeout=10)
-        return response.json()
-    except:
-        return None
-
-# Função para traduzir dados de receitas (otimizada)
-def translate_recipe_data(recipe_data):
-    try:
-        # Tradução em batch para campos principais
-        fields_to_translate = [
-            recipe_data.get('strMeal', ''),
-            recipe_data.get('strCategory', ''),
-            recipe_data.get('strArea', ''),
-            recipe_data.get('strInstructions', '')
-        ]
-        
-        # Traduz todos os campos principais de uma vez
-        translated_fields = GoogleTranslator(source='en', target='pt').translate_batch(fields_to_translate)
-        
-        recipe_data['strMeal'] = translated_fields[0]
-        recipe_data['strCategory'] = translated_fields[1]
-        recipe_data['strArea'] = translated_fields[2]
-        recipe_data['strInstructions'] = translated_fields[3]
-        
-        # Traduz e ajusta medidas
-        for i in range(1, 21):
-            ingredient_key = f'strIngredient{i}'
-            measure_key = f'strMeasure{i}'
-            
-            if recipe_data.get(ingredient_key) and recipe_data[ingredient_key].strip():
-                recipe_data[ingredient_key] = translator_en_pt(recipe_data[ingredient_key])
-            
-            if recipe_data.get(measure_key) and recipe_data[measure_key].strip():
-                measure_text = translator_en_pt(recipe_data[measure_key])
-                
-                # Aplica substituições de unidades
-                replacements = {
-                    'tbs': 'colher de sopa',
-                    'TBS': 'colher de sopa',
-                    'TBSP': 'colheres de sopa',
-                    'Tbsp': 'colheres de sopa',
-                    'tbsp': 'colheres de sopa',
-                    'tsp': 'colher de chá',
-                    'TSP': 'colher de chá',
-                    'cup': 'xícara',
-                    'cups': 'xícaras',
-                    'Tblsp': 'colheres de sopa',
-                    'TBLSP': 'colheres de sopa',
-                    'ounce': 'onça',
-                    'ounces': 'onças',
-                    'pound': 'libra',
-                    'pounds': 'libras',
-                    'kg': 'kg',
-                    'g': 'g',
-                    'ml': 'ml',
-                    'liter': 'litro',
-                    'l': 'l'
-                }
-                
-                for eng, pt in replacements.items():
-                    measure_text = measure_text.replace(eng, pt)
-                
-                recipe_data[measure_key] = measure_text
-                
-        return recipe_data
+        stats = search.translate_results(recipes)
+        if stats:
+            st.session_state.translation_stats = stats.as_dict()
     except Exception as e:
         st.error(f"Erro na tradução: {e}")
-        return recipe_data
 
-# Função para buscar detalhes de uma receita (usada no paralelismo)
-def fetch_recipe_details(recipe_id):
-    try:
-        response = cached_api_request(f"https://www.themealdb.com/api/json/v1/1/lookup.php?i={recipe_id}")
-        if not response or 'meals' not in response or not response['meals']:
-            return None
-            
-        recipe_data = response['meals'][0]
-        return recipe_id, recipe_data
-    except:
-        return None
-
-# Função para buscar receitas por ingredientes (otimizada)
-def get_recipes_by_matching_ingredients(user_ingredients, area=None, max_recipes=10):
-    # Traduz ingredientes para inglês
-    translated_ingredients = [translator_pt_en(ing.lower().strip()) for ing in user_ingredients]
-    
-    recipe_ids = set()
-    for ingredient in translated_ingredients:
-        data = cached_api_request(f"https://www.themealdb.com/api/json/v1/1/filter.php?i={ingredient}")
-        if data and data.get('meals'):
-            for meal in data['meals']:
-                recipe_ids.add(meal['idMeal'])
-
-    if not recipe_ids:
-        return []
-
-    # Busca paralela de detalhes das receitas
-    recipes = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_id = {executor.submit(fetch_recipe_details, rid): rid for rid in list(recipe_ids)[:50]}
-        for future in concurrent.futures.as_completed(future_to_id):
-            result = future.result()
-            if result:
-                recipe_id, recipe_data = result
-                # Verifica se já está no cache global
-                if recipe_id in st.session_state.all_recipes_data:
-                    recipe_obj = st.session_state.all_recipes_data[recipe_id]
-                    if not area or area == "Todos" or recipe_obj['data'].get('strArea') == area:
-                        recipes.append(recipe_obj)
-                else:
-                    # Processa nova receita
-                    recipe_data = translate_recipe_data(recipe_data)
-                    
-                    if area and area != "Todos" and recipe_data.get('strArea') != area:
-                        continue
-                    
-                    recipe_ingredients = []
-                    for i in range(1, 21):
-                        ingredient_key = f'strIngredient{i}'
-                        if recipe_data.get(ingredient_key) and recipe_data[ingredient_key].strip():
-                            ingredient = recipe_data[ingredient_key].strip().lower()
-                            recipe_ingredients.append(ingredient)
-                    
-                    # Algoritmo de matching melhorado
-                    user_ing_lower = [ing.lower() for ing in user_ingredients]
-                    matches = 0
-                    for ing in recipe_ingredients:
-                        # Verifica correspondência parcial e sinônimos comuns
-                        if any(orig_ing in ing for orig_ing in user_ing_lower) or \
-                           any(ing in orig_ing for orig_ing in user_ing_lower):
-                            matches += 1
-                    
-                    total_ingredients = len(recipe_ingredients)
-                    
-                    recipe_object = {
-                        'data': recipe_data,
-                        'ingredients': recipe_ingredients,
-                        'matches': matches,
-                        'total': total_ingredients
-                    }
-                    recipes.append(recipe_object)
-                    st.session_state.all_recipes_data[recipe_id] = recipe_object
-
-    # Ordena por compatibilidade e limita resultados
-    recipes.sort(key=lambda x: (x['matches']/x['total'], x['matches']), reverse=True)
-    return recipes[:max_recipes]
-
-# Função para buscar receitas por país
-def get_recipes_by_area(area):
+# Função para pré-carregar a próxima página em segundo plano
+def prefetch_area_page(meal_ids):
+    def run():
+        try:
+            page_recipes = search.load_recipes(meal_ids)
+            images.prefetch([recipe.base.thumb for recipe in page_recipes], IMAGE_WIDTH_COUNTRY)
+            recipes_mod.translate_many(page_recipes)
+        except Exception:
+            pass
+    threading.Thread(target=run, name="area-prefetch", daemon=True).start()
+
+# Função para buscar receitas por país, paginadas. Retorna as receitas
+# traduzidas da página e o total de receitas do país.
+def get_recipes_by_area(area, page=0, page_size=AREA_PAGE_SIZE, prefetch_next=False):
+    page_recipes, total, next_ids = search.area_page(area, page, page_size)
+    images.prefetch([recipe.base.thumb for recipe in page_recipes], IMAGE_WIDTH_COUNTRY)
+    translate_for_display(page_recipes)
+
+    if prefetch_next and next_ids:
+        prefetch_area_page(next_ids)
+
+    return [recipe.data for recipe in page_recipes], total
+
+# Resultado da última busca guardado na sessão: só as referências das
+# receitas exibidas, para reexibi-lo sem refazer a busca a cada execução
+def search_view(user_ingredients, country_filter, recipes):
+    return {
+        'ingredients': user_ingredients,
+        'area': country_filter,
+        'found': len(recipes),
+        'results': [recipe.ref() for recipe in recipes[:3]],
+    }
+
+# Função para exibir o resultado da busca (recipes: as receitas já
+# carregadas, ou None para carregá-las das referências)
+def show_search_results(view, recipes=None):
+    if recipes is None:
+        recipes = [recipe for recipe in map(recipes_mod.from_ref, view['results']) if recipe is not None]
+    if not recipes:
+        st.error("Nenhuma receita encontrada. Tente outros ingredientes!")
+        return
+
+    st.success(f"🔍 Encontradas {view['found']} receitas!")
+    st.subheader("🥇 Receita Principal")
+    display_recipe(recipes[0], is_main=True)
+
+    if len(recipes) > 1:
+        st.subheader("🥈 Outras Opções")
+        cols = st.columns(min(2, len(recipes)-1))
+        for idx in range(1, min(3, len(recipes))):
+             with cols[idx-1]:
+                 display_recipe(recipes[idx])
+
+# Fragmentos (st.fragment, Streamlit >= 1.37): interações com os widgets de
+# dentro reexecutam só o fragmento, não a página. Sem suporte, viram funções
+# comuns.
+fragment = getattr(st, 'fragment', None) or (lambda func: func)
+
+def rerun_fragment():
     try:
-        response = session.get(
-            f"https://www.themealdb.com/api/json/v1/1/filter.php?a={area}"
-        )
-        data = response.json()
-        if not data.get('meals'):
-            return []
-            
-        # Obtém detalhes completos e traduz cada receita
-        detailed_recipes = []
-        for meal in data['meals'][:5]:
-            recipe_response = session.get(
-                f"https://www.themealdb.com/api/json/v1/1/lookup.php?i={meal['idMeal']}"
-            )
-            recipe_data = recipe_response.json()['meals'][0]
-            detailed_recipes.append(translate_recipe_data(recipe_data))
-        
-        return detailed_recipes
-    except requests.exceptions.RequestException:
-        return []
+        st.rerun(scope="fragment")
+    except (TypeError, st.errors.StreamlitAPIException):
+        # Sem fragmentos ou fora de uma reexecução do fragmento
+        st.rerun()
 
-# Função para buscar lista de países (traduzida)
-def get_areas():
-    try:
-        response = session.get(
-            "https://www.themealdb.com/api/json/v1/1/list.php?a=list"
-        )
-        data = response.json()
-        areas = ["Todos"] + sorted([area['strArea'] for area in data['meals']])
-        
-        # Traduz nomes dos países
-        translated_areas = ["Todos"]
-        for area in areas[1:]:
-            try:
-                translated_areas.append(translator_en_pt(area))
-            except:
-                translated_areas.append(area)
-                
-        return translated_areas
-    except requests.exceptions.RequestException:
-        return ["Todos"]
+# Função para exibir a avaliação de uma receita. Salvar só atualiza o
+# estado da sessão; a barra lateral reflete a nota na próxima execução.
+@fragment
+def rating_widget(recipe_id, key, label="Avalie esta receita:", message="Avaliação salva com sucesso!",
+                  show_current=False):
+    current_header = st.empty() if show_current else None
+    current_rating = st.session_state.user_ratings.get(recipe_id, 0)
+    new_rating = st.slider(label, 1, 5, current_rating, key=f"rate_{key}")
+
+    if st.button("Salvar Avaliação", key=f"btn_rate_{key}"):
+        st.session_state.user_ratings[recipe_id] = new_rating
+        st.success(message)
+
+    if current_header is not None and recipe_id in st.session_state.user_ratings:
+        current_header.subheader(f"⭐ Sua Avaliação: {st.session_state.user_ratings[recipe_id]}/5")
 
 # Função para exibir receitas
-def display_recipe(recipe, user_ingredients, is_main=False):
+def display_recipe(recipe, is_main=False):
+    with metrics.span('render'):
+        _display_recipe(recipe, is_main)
+
+def _display_recipe(recipe, is_main):
     recipe_data = recipe['data']
     recipe_id = recipe_data['idMeal']
 
@@ -227,11 +134,14 @@ def display_recipe(recipe, user_ingredients, is_main=False):
     with st.expander("", expanded=is_main):
         if recipe_data.get('strMealThumb'):
             try:
-                response_img = requests.get(recipe_data['strMealThumb'])
-                img = Image.open(io.BytesIO(response_img.content))
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col2:
-                    st.image(img, caption=recipe_data['strMeal'], width=240)
+                with metrics.span('image'):
+                    img = images.get_image(recipe_data['strMealThumb'], IMAGE_WIDTH_RESULT)
+                if img is None:
+                    st.warning("Não foi possível carregar a imagem da receita")
+                else:
+                    col1, col2, col3 = st.columns([1, 2, 1])
+                    with col2:
+                        st.image(img, caption=recipe_data['strMeal'], width=IMAGE_WIDTH_RESULT)
             except:
                 st.warning("Não foi possível carregar a imagem da receita")
 
@@ -247,24 +157,145 @@ def display_recipe(recipe, user_ingredients, is_main=False):
             col2.markdown(f"📺 [Vídeo no YouTube]({recipe_data['strYoutube']})")
 
         st.subheader("📋 Ingredientes:")
-        for ing in recipe['ingredients']:
-            match_indicator = "✅" if any(orig_ing.lower() in ing for orig_ing in user_ingredients) else "❌"
+        for ing, is_match in zip(recipe['ingredients'], recipe.ingredient_matches()):
+            match_indicator = "✅" if is_match else "❌"
             st.markdown(f"{match_indicator} {ing.capitalize()}")
 
         st.subheader("👩‍🍳 Instruções:")
         st.write(recipe_data['strInstructions'])
         
-        current_rating = st.session_state.user_ratings.get(recipe_id, 0)
-        new_rating = st.slider(
-            "Avalie esta receita:",
-            1, 5, current_rating,
-            key=f"rate_{recipe_id}_{is_main}"
-        )
-
-        if st.button("Salvar Avaliação", key=f"btn_rate_{recipe_id}_{is_main}"):
-            st.session_state.user_ratings[recipe_id] = new_rating
-            st.success("Avaliação salva com sucesso!")
-            st.rerun()
+        rating_widget(recipe_id, f"{recipe_id}_{is_main}")
+
+# Função para carregar uma página das receitas típicas de um país
+def load_country_page(country_en, page):
+    with metrics.trace('area', area=country_en, page=page) as area_trace:
+        try:
+            country_recipes, country_total = get_recipes_by_area(country_en, page, prefetch_next=AREA_PREFETCH)
+        except Exception:
+            country_recipes, country_total = [], 0
+    if area_trace is not None:
+        st.session_state.last_trace = area_trace.as_dict()
+    st.session_state.country_en = country_en
+    st.session_state.country_page = page
+    st.session_state.country_recipes = [recipe['idMeal'] for recipe in country_recipes]
+    st.session_state.country_total = country_total
+
+# Função para listar receitas recomendadas (id, similaridade) com botão
+# para abrir cada uma. Usa só o catálogo local e os títulos já traduzidos.
+def show_recommendations(items, key_prefix, show_score=True):
+    for recipe_id, score in items:
+        recipe = recipes_mod.load(recipe_id)
+        if recipe is None:
+            continue
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            score_text = f" ({score:.0%})" if show_score else ""
+            st.markdown(f"• **{recipes_mod.cached_title(recipe)}**{score_text}")
+        with col2:
+            if st.button("Ver", key=f"{key_prefix}_{recipe_id}", use_container_width=True):
+                st.session_state.selected_recipe = recipe.ref()
+                st.rerun()
+
+
+# Função para exibir o painel de desempenho (RECEITA_METRICS=1): etapas da
+# última busca desta sessão, somadas por nome, e contadores do processo
+def render_debug_panel():
+    with st.expander("🔧 Desempenho", expanded=False):
+        trace = st.session_state.get('last_trace')
+        if not trace:
+            st.caption("Nenhuma busca medida ainda.")
+        else:
+            st.caption(f"Última busca ({trace['trace']}): {trace['ms']:.0f} ms")
+            stages = {}
+            for span in trace['spans']:
+                stage = stages.setdefault(span['name'], {'etapa': span['name'], 'vezes': 0, 'ms': 0.0})
+                stage['vezes'] += 1
+                stage['ms'] = round(stage['ms'] + span['ms'], 1)
+            st.table(list(stages.values()))
+            st.json(trace['counts'])
+        st.caption("Camada HTTP")
+        st.json(mealdb.stats())
+        st.caption("Cache de receitas")
+        st.json(recipe_cache.shared.stats())
+        st.caption("Aquecimento dos caches")
+        st.json(warmer.status())
+        st.caption("Recomendações")
+        st.json(recommend.get_engine().stats())
+        st.caption("Busca por nome")
+        st.json(text_index.get_index().stats())
+        st.caption("Tradutores")
+        st.json(translators.get_backend().stats())
+        if 'translation_stats' in st.session_state:
+            st.caption("Última tradução")
+            st.json(st.session_state.translation_stats)
+
+# Seções da barra lateral (fragmentos: digitar na busca por nome ou remover
+# uma receita não reexecuta a página; "Ver" navega e reexecuta tudo)
+@fragment
+def text_search_sidebar():
+    st.header("🔎 Buscar Receitas pelo Nome")
+    query = st.text_input("Nome, ingrediente ou modo de preparo:", placeholder="Ex: frango ao curry",
+                          key="text_query")
+    if query.strip():
+        with metrics.span('text_search'):
+            results = text_index.search(query, k=TEXT_SEARCH_RESULTS)
+        if results:
+            show_recommendations(results, "text_result", show_score=False)
+        else:
+            st.caption("Nenhuma receita encontrada no catálogo local.")
+
+@fragment
+def saved_recipes_sidebar():
+    st.header("📚 Receitas Pesquisadas")
+    st.caption("Suas últimas receitas pesquisadas")
+
+    if not st.session_state.saved_main_recipes:
+        st.info("Nenhuma receita salva ainda. Faça uma busca!")
+    else:
+        for i, saved_ref in enumerate(st.session_state.saved_main_recipes):
+            recipe = recipes_mod.from_ref(saved_ref)
+            if recipe is None:
+                continue
+            with st.expander(f"**{recipe['data']['strMeal']}**", expanded=False):
+                st.caption(f"Compatibilidade: {recipe['matches']}/{recipe['total']}")
+                recipe_id = recipe.id
+                if recipe_id in st.session_state.user_ratings:
+                    rating = st.session_state.user_ratings[recipe_id]
+                    st.caption(f"⭐ Sua avaliação: {rating}/5")
+
+                if st.button("Ver Receita", key=f"view_saved_{i}"):
+                    st.session_state.selected_recipe = saved_ref
+                    st.rerun()
+
+                if st.button("Remover", key=f"remove_saved_{i}"):
+                    st.session_state.saved_main_recipes.pop(i)
+                    rerun_fragment()
+
+@fragment
+def ratings_sidebar():
+    st.header("⭐ Minhas Avaliações")
+    if not st.session_state.user_ratings:
+        st.info("Você ainda não avaliou nenhuma receita.")
+    else:
+        sorted_ratings = sorted(st.session_state.user_ratings.items(), key=lambda item: item[1], reverse=True)
+
+        for recipe_id, rating in sorted_ratings:
+            recipe_data_obj = recipes_mod.load(recipe_id)
+            if recipe_data_obj:
+                with st.container():
+                    col1, col2 = st.columns([4, 1])
+                    with col1:
+                         st.markdown(f"{'⭐' * rating} - **{recipe_data_obj['data']['strMeal']}**")
+                    with col2:
+                        if st.button("Ver", key=f"view_rated_{recipe_id}", use_container_width=True):
+                            st.session_state.selected_recipe = recipe_data_obj.ref()
+                            st.rerun()
+
+        with metrics.span('recommend'):
+            recommended = recommend.recommend(st.session_state.user_ratings, k=5)
+        if recommended:
+            st.subheader("✨ Recomendadas para você")
+            show_recommendations(recommended, "recommended")
 
 # Função para resetar a visualização
 def go_home():
@@ -293,8 +324,13 @@ if 'user_ratings' not in st.session_state:
 if 'show_random_recipes' not in st.session_state:
     st.session_state.show_random_recipes = False
 
-if 'all_recipes_data' not in st.session_state:
-    st.session_state.all_recipes_data = {}
+# Importa o snapshot do catálogo (RECEITA_SNAPSHOT), se houver, antes de
+# sincronizar: só as partes vencidas vão à rede
+snapshot.import_on_startup()
+# Carrega/atualiza o catálogo local em segundo plano (uma vez por processo)
+catalog.start_background_sync()
+# Aquece os caches com os ingredientes mais buscados (uma vez por processo)
+warmer.start()
 
 
 # Interface
@@ -319,70 +355,34 @@ with st.sidebar:
         go_home()
 
     st.header("🌍 Descubra Receitas por Nacionalidades")
-    area_list = get_areas()
+    area_list = search.area_labels()
     selected_country = st.selectbox("Escolha um país:", area_list, key="country_select")
 
     if st.button("Mostrar Receitas Típicas"):
         st.session_state.show_random_recipes = True
         # Obtém nome original do país para a API
-        try:
-            if selected_country != "Todos":
-                country_en = GoogleTranslator(source='pt', target='en').translate(selected_country)
-            else:
-                country_en = "All"
-                
-            st.session_state.country_recipes = get_recipes_by_area(country_en)
-        except:
-            st.session_state.country_recipes = []
-            
+        country_en = areas.get_registry().to_en(selected_country) or "All"
+        load_country_page(country_en, 0)
+
         st.session_state.selected_country = selected_country
         if 'selected_recipe' in st.session_state:
             del st.session_state.selected_recipe
         st.rerun()
 
     st.markdown("---")
-    
-    st.header("📚 Receitas Pesquisadas")
-    st.caption("Suas últimas receitas pesquisadas")
 
-    if not st.session_state.saved_main_recipes:
-        st.info("Nenhuma receita salva ainda. Faça uma busca!")
-    else:
-        for i, recipe in enumerate(st.session_state.saved_main_recipes):
-            with st.expander(f"**{recipe['data']['strMeal']}**", expanded=False):
-                st.caption(f"Compatibilidade: {recipe['matches']}/{recipe['total']}")
-                recipe_id = recipe['data']['idMeal']
-                if recipe_id in st.session_state.user_ratings:
-                    rating = st.session_state.user_ratings[recipe_id]
-                    st.caption(f"⭐ Sua avaliação: {rating}/5")
-
-                if st.button("Ver Receita", key=f"view_saved_{i}"):
-                    st.session_state.selected_recipe = recipe
-                    st.rerun()
+    text_search_sidebar()
 
-                if st.button("Remover", key=f"remove_saved_{i}"):
-                    st.session_state.saved_main_recipes.pop(i)
-                    st.rerun()
+    st.markdown("---")
+    
+    saved_recipes_sidebar()
 
     st.markdown("---")
 
-    st.header("⭐ Minhas Avaliações")
-    if not st.session_state.user_ratings:
-        st.info("Você ainda não avaliou nenhuma receita.")
-    else:
-        sorted_ratings = sorted(st.session_state.user_ratings.items(), key=lambda item: item[1], reverse=True)
+    ratings_sidebar()
 
-        for recipe_id, rating in sorted_ratings:
-            recipe_data_obj = st.session_state.all_recipes_data.get(recipe_id)
-            if recipe_data_obj:
-                with st.container():
-                    col1, col2 = st.columns([4, 1])
-                    with col1:
-                         st.markdown(f"{'⭐' * rating} - **{recipe_data_obj['data']['strMeal']}**")
-                    with col2:
-                        if st.button("Ver", key=f"view_rated_{recipe_id}", use_container_width=True):
-                            st.session_state.selected_recipe = recipe_data_obj
-                            st.rerun()
+    # Preenchido no fim da execução, depois da busca
+    debug_panel = st.empty() if metrics.ENABLED else None
 
 
 
@@ -393,61 +393,72 @@ if st.session_state.get('show_random_recipes', False):
     if not st.session_state.get('country_recipes'):
         st.warning(f"Não encontramos receitas de {st.session_state.selected_country}.")
     else:
-        for recipe in st.session_state.country_recipes:
-            title_html = f"<h3 style='font-size:22px; margin-bottom:10px;'>{recipe['strMeal']}</h3>"
-            st.markdown(title_html, unsafe_allow_html=True)
-
-            with st.expander("Ver Receita", expanded=True):
-                try:
-                    recipe_id = recipe['idMeal']
-                    if recipe_id not in st.session_state.all_recipes_data:
-                        recipe_ingredients = [recipe.get(f'strIngredient{i}', '').strip() 
-                                            for i in range(1, 21) 
-                                            if recipe.get(f'strIngredient{i}', '').strip()]
-                        
-                        st.session_state.all_recipes_data[recipe_id] = {
-                            'data': recipe,
-                            'ingredients': recipe_ingredients,
-                            'matches': 0,
-                            'total': len(recipe_ingredients)
-                        }
-
-                    if recipe.get('strMealThumb'):
-                        try:
-                            response_img = requests.get(recipe['strMealThumb'])
-                            img = Image.open(io.BytesIO(response_img.content))
-                            col1, col2, col3 = st.columns([1, 2, 1])
-                            with col2:
-                                st.image(img, caption=recipe['strMeal'], width=300)
-                        except:
-                            st.warning("Não foi possível carregar a imagem da receita.")
-
-                    st.caption(f"🗂️ Categoria: {recipe.get('strCategory', 'N/A')}")
-                    st.caption(f"🌍 Cozinha: {recipe.get('strArea', 'N/A')}")
-
-                    st.subheader("📋 Ingredientes:")
-                    for i in range(1, 21):
-                        ingredient = recipe.get(f'strIngredient{i}', '').strip()
-                        measure = recipe.get(f'strMeasure{i}', '').strip()
-                        if ingredient:
-                            st.markdown(f"- {measure} {ingredient}")
-
-                    st.subheader("👩‍🍳 Instruções:")
-                    st.write(recipe['strInstructions'])
-
-                    current_rating = st.session_state.user_ratings.get(recipe_id, 0)
-                    new_rating = st.slider("Avalie esta receita:", 1, 5, current_rating, key=f"rate_country_{recipe_id}")
-                    if st.button("Salvar Avaliação", key=f"save_country_{recipe_id}"):
-                        st.session_state.user_ratings[recipe_id] = new_rating
-                        st.success("Avaliação salva!")
-                        st.rerun()
-
-                except (requests.exceptions.RequestException, KeyError, IndexError):
-                    st.error("Erro ao carregar detalhes da receita.")
+        with metrics.trace('area_render', page=st.session_state.get('country_page', 0)):
+            for country_recipe_id in st.session_state.country_recipes:
+                country_recipe = recipes_mod.load(country_recipe_id)
+                if country_recipe is None:
+                    continue
+                recipe = country_recipe.data
+                title_html = f"<h3 style='font-size:22px; margin-bottom:10px;'>{recipe['strMeal']}</h3>"
+                st.markdown(title_html, unsafe_allow_html=True)
+
+                with st.expander("Ver Receita", expanded=True):
+                    try:
+                        recipe_id = recipe['idMeal']
+
+                        if recipe.get('strMealThumb'):
+                            try:
+                                with metrics.span('image'):
+                                    img = images.get_image(recipe['strMealThumb'], IMAGE_WIDTH_COUNTRY)
+                                if img is None:
+                                    st.warning("Não foi possível carregar a imagem da receita.")
+                                else:
+                                    col1, col2, col3 = st.columns([1, 2, 1])
+                                    with col2:
+                                        st.image(img, caption=recipe['strMeal'], width=IMAGE_WIDTH_COUNTRY)
+                            except:
+                                st.warning("Não foi possível carregar a imagem da receita.")
+
+                        st.caption(f"🗂️ Categoria: {recipe.get('strCategory', 'N/A')}")
+                        st.caption(f"🌍 Cozinha: {recipe.get('strArea', 'N/A')}")
+
+                        st.subheader("📋 Ingredientes:")
+                        for i in range(1, 21):
+                            ingredient = recipe.get(f'strIngredient{i}', '').strip()
+                            measure = recipe.get(f'strMeasure{i}', '').strip()
+                            if ingredient:
+                                st.markdown(f"- {measure} {ingredient}")
+
+                        st.subheader("👩‍🍳 Instruções:")
+                        st.write(recipe['strInstructions'])
+
+                        rating_widget(recipe_id, f"country_{recipe_id}", message="Avaliação salva!")
+
+                    except (requests.exceptions.RequestException, KeyError, IndexError):
+                        st.error("Erro ao carregar detalhes da receita.")
+
+        # Paginação das receitas do país
+        page = st.session_state.get('country_page', 0)
+        total_pages = max(1, -(-st.session_state.get('country_total', 0) // AREA_PAGE_SIZE))
+        if total_pages > 1:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if page > 0 and st.button("◀ Anterior", key="country_prev", use_container_width=True):
+                    load_country_page(st.session_state.country_en, page - 1)
+                    st.rerun()
+            with col2:
+                st.caption(f"Página {page + 1} de {total_pages}")
+            with col3:
+                if page + 1 < total_pages and st.button("Próxima ▶", key="country_next", use_container_width=True):
+                    load_country_page(st.session_state.country_en, page + 1)
+                    st.rerun()
 
 # 2. Mostrar Receita Selecionada da Barra Lateral
 elif 'selected_recipe' in st.session_state:
-    recipe = st.session_state.selected_recipe
+    recipe = recipes_mod.from_ref(st.session_state.selected_recipe)
+    if recipe is None:
+        st.warning("Receita não encontrada.")
+        st.stop()
     recipe_data = recipe['data']
     recipe_id = recipe_data['idMeal']
 
@@ -456,11 +467,13 @@ elif 'selected_recipe' in st.session_state:
 
     if recipe_data.get('strMealThumb'):
         try:
-            response_img = requests.get(recipe_data['strMealThumb'])
-            img = Image.open(io.BytesIO(response_img.content))
-            col1, col2, col3 = st.columns([1, 3, 1])
-            with col2:
-                st.image(img, width=350)
+            img = images.get_image(recipe_data['strMealThumb'], IMAGE_WIDTH_SELECTED)
+            if img is None:
+                st.warning("Não foi possível carregar a imagem da receita")
+            else:
+                col1, col2, col3 = st.columns([1, 3, 1])
+                with col2:
+                    st.image(img, width=IMAGE_WIDTH_SELECTED)
         except:
             st.warning("Não foi possível carregar a imagem da receita")
 
@@ -468,16 +481,8 @@ elif 'selected_recipe' in st.session_state:
         st.caption(f"🎯 Compatibilidade: {recipe['matches']}/{recipe['total']} ingredientes")
         st.progress(recipe['matches'] / recipe['total'])
 
-    if recipe_id in st.session_state.user_ratings:
-        st.subheader(f"⭐ Sua Avaliação: {st.session_state.user_ratings[recipe_id]}/5")
-
-    current_rating = st.session_state.user_ratings.get(recipe_id, 0)
-    new_rating = st.slider("Atualize sua avaliação:", 1, 5, current_rating, key=f"rate_selected_{recipe_id}")
-
-    if st.button("Salvar Avaliação", key=f"btn_rate_selected_{recipe_id}"):
-        st.session_state.user_ratings[recipe_id] = new_rating
-        st.success("Avaliação atualizada com sucesso!")
-        st.rerun()
+    rating_widget(recipe_id, f"selected_{recipe_id}", "Atualize sua avaliação:",
+                  "Avaliação atualizada com sucesso!", show_current=True)
 
     col1, col2 = st.columns(2)
     if recipe_data.get('strSource'):
@@ -494,6 +499,12 @@ elif 'selected_recipe' in st.session_state:
     st.caption(f"🗂️ Categoria: {recipe_data.get('strCategory', 'N/A')}")
     st.caption(f"🌍 Cozinha: {recipe_data.get('strArea', 'N/A')}")
 
+    with metrics.span('similar'):
+        similar = recommend.similar(recipe_id, k=5)
+    if similar:
+        st.subheader("🍽️ Receitas parecidas")
+        show_recommendations(similar, "similar")
+
 # 3. Mostrar Busca por Ingredientes (Página Inicial)
 else:
     st.subheader("🔍 Buscar por Ingredientes")
@@ -502,7 +513,7 @@ else:
         placeholder="Ex: frango, arroz, cebola",
         key="ingredient_input"
     )
-    country_filter = st.selectbox("Filtrar por país (opcional):", get_areas(), key="country_filter")
+    country_filter = st.selectbox("Filtrar por país (opcional):", area_list, key="country_filter")
 
     if st.button("Buscar Receitas"):
         if not user_input:
@@ -510,36 +521,44 @@ else:
             st.stop()
 
         user_ingredients = [ing.strip() for ing in user_input.split(',') if ing.strip()]
-        with st.spinner("Procurando receitas incríveis para você..."):
-            # Converte filtro de país para inglês se necessário
-            try:
-                if country_filter != "Todos":
-                    country_en = GoogleTranslator(source='pt', target='en').translate(country_filter)
-                else:
-                    country_en = None
-            except:
-                country_en = None
+        warmer.record_query(user_ingredients)
+        with metrics.trace('search', ingredients=len(user_ingredients)) as search_trace:
+            # Mostra os melhores resultados parciais enquanto a busca continua
+            progress_area = st.empty()
+
+            def show_progress(found):
+                with progress_area.container():
+                    st.caption(f"⏳ {len(found)} receitas analisadas...")
+                    for recipe in sorted(found, key=search.recipe_sort_key, reverse=True)[:3]:
+                        st.markdown(f"• {recipes_mod.cached_title(recipe)} ({recipe.matches}/{recipe.total})")
+
+            with st.spinner("Procurando receitas incríveis para você..."):
+                # Converte filtro de país para inglês se necessário
+                country_en = areas.get_registry().to_en(country_filter)
                 
-            recipes = get_recipes_by_matching_ingredients(user_ingredients, country_en)
-
-        if not recipes:
-            st.error("Nenhuma receita encontrada. Tente outros ingredientes!")
-        else:
-            main_recipe = recipes[0]
-            if main_recipe not in st.session_state.saved_main_recipes:
-                st.session_state.saved_main_recipes.insert(0, main_recipe)
-            st.session_state.saved_main_recipes = st.session_state.saved_main_recipes[:10]
-
-            st.success(f"🔍 Encontradas {len(recipes)} receitas!")
-            st.subheader("🥇 Receita Principal")
-            display_recipe(main_recipe, user_ingredients, is_main=True)
-
-            if len(recipes) > 1:
-                st.subheader("🥈 Outras Opções")
-                cols = st.columns(min(2, len(recipes)-1))
-                for idx in range(1, min(3, len(recipes))):
-                     with cols[idx-1]:
-                         display_recipe(recipes[idx], user_ingredients)
+                recipes = search.find_recipes(user_ingredients, country_en,
+                                              on_progress=show_progress)
+            progress_area.empty()
+
+            if recipes:
+                main_recipe = recipes[0]
+                if main_recipe.id not in [saved_ref['id'] for saved_ref in st.session_state.saved_main_recipes]:
+                    st.session_state.saved_main_recipes.insert(0, main_recipe.ref())
+                st.session_state.saved_main_recipes = st.session_state.saved_main_recipes[:10]
+
+                # Baixa as imagens em paralelo e traduz apenas as receitas que
+                # serão exibidas
+                images.prefetch([recipe.base.thumb for recipe in recipes[:3]], IMAGE_WIDTH_RESULT)
+                translate_for_display(recipes[:3])
+
+            st.session_state.search_view = search_view(user_ingredients, country_filter, recipes)
+            show_search_results(st.session_state.search_view, recipes[:3])
+        if search_trace is not None:
+            st.session_state.last_trace = search_trace.as_dict()
+    elif st.session_state.get('search_view'):
+        # Resultado da última busca, refeito a partir das referências (as
+        # traduções e imagens já estão em cache)
+        show_search_results(st.session_state.search_view)
 st.markdown("---")
 
 st.markdown("***Experiência Chef: Seu Assistente de Cozinha Inteligente***")
@@ -557,3 +576,7 @@ st.markdown("Em resumo, o Experiência Chef é uma ferramenta completa que ofere
 
 st.markdown("---")
 st.markdown("Desenvolvido usando [TheMealDB API](https://www.themealdb.com/)")
+
+if debug_panel is not None:
+    with debug_panel.container():
+        render_debug_panel()
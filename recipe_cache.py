@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import catalog
+
+# Cache de receitas compartilhado por todas as sessões do processo. As
+# receitas ficam em uma representação compacta (slots, tuplas de strings
+# internadas, sem os 40 campos strIngredientN/strMeasureN vazios) e o cache
+# é um LRU limitado por bytes.
+
+CACHE_BYTES = int(os.environ.get("RECEITA_RECIPE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Campo da API -> atributo da receita compacta (os de catalog.MEAL_FIELDS)
+FIELDS = {
+    'idMeal': 'id',
+    'strMeal': 'name',
+    'strCategory': 'category',
+    'strArea': 'area',
+    'strInstructions': 'instructions',
+    'strMealThumb': 'thumb',
+    'strTags': 'tags',
+    'strSource': 'source',
+    'strYoutube': 'youtube',
+}
+
+
+def _intern(value):
+    return sys.intern(value) if value else ''
+
+
+class Recipe:
+    __slots__ = tuple(FIELDS.values()) + ('ingredients', 'measures')
+
+    def __init__(self, id, name='', category='', area='', instructions='', thumb='', tags='',
+                 source='', youtube='', ingredients=(), measures=()):
+        self.id = id
+        self.name = name
+        # Textos curtos e repetidos entre receitas são internados
+        self.category = _intern(category)
+        self.area = _intern(area)
+        self.instructions = instructions or ''
+        self.thumb = thumb or ''
+        self.tags = _intern(tags)
+        self.source = source or ''
+        self.youtube = youtube or ''
+        self.ingredients = tuple(_intern(ing) for ing in ingredients)
+        self.measures = tuple(_intern(measure) for measure in measures)
+
+    # Função para criar a receita compacta a partir do formato da API
+    @classmethod
+    def from_meal(cls, meal):
+        pairs = catalog.meal_ingredients(meal)
+        values = {attr: meal.get(field) or '' for field, attr in FIELDS.items()}
+        return cls(ingredients=[ing for ing, _ in pairs], measures=[measure for _, measure in pairs], **values)
+
+    # Função para voltar ao formato da API (usado pela interface e tradução)
+    def to_meal(self):
+        meal = {field: getattr(self, attr) for field, attr in FIELDS.items()}
+        for i, (ingredient, measure) in enumerate(zip(self.ingredients, self.measures), 1):
+            meal[f'strIngredient{i}'] = ingredient
+            meal[f'strMeasure{i}'] = measure
+        return meal
+
+    # Estimativa do espaço ocupado (strings internadas contam uma vez por receita)
+    def nbytes(self):
+        size = sys.getsizeof(self) + sys.getsizeof(self.ingredients) + sys.getsizeof(self.measures)
+        for attr in FIELDS.values():
+            size += sys.getsizeof(getattr(self, attr))
+        size += sum(sys.getsizeof(value) for value in self.ingredients + self.measures)
+        return size
+
+    def __repr__(self):
+        return f"Recipe({self.id!r}, {self.name!r})"
+
+
+# LRU limitado por bytes e seguro para várias threads
+class RecipeCache:
+    def __init__(self, budget=CACHE_BYTES):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, recipe):
+        nbytes = recipe.nbytes()
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._items[key] = (recipe, nbytes)
+            self.size += nbytes
+            while self.size > self.budget and len(self._items) > 1:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+        return recipe
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        return {'entries': len(self._items), 'bytes': self.size, 'budget': self.budget,
+                'hits': self.hits, 'misses': self.misses}
+
+
+shared = RecipeCache()
+
+
+# Função para guardar uma receita da API (em inglês) no cache
+def put_meal(meal, lang='en'):
+    return shared.put((meal['idMeal'], lang), Recipe.from_meal(meal))
+
+
+# Função para obter uma receita: cache compartilhado e, se não houver,
+# catálogo local
+def get_recipe(recipe_id, lang='en'):
+    recipe = shared.get((recipe_id, lang))
+    if recipe is None and lang == 'en':
+        meal = catalog.get_meal(recipe_id)
+        if meal:
+            recipe = put_meal(meal)
+    return recipe
@@ -0,0 +1,131 @@
+import recipe_cache
+import text_index
+import translation
+import translation_cache
+
+# Receitas com tradução sob demanda: a busca pontua e ordena usando os dados
+# originais (em inglês) e só traduz quando a receita é exibida. As receitas,
+# originais e traduzidas, ficam no cache compartilhado (recipe_cache); cada
+# LazyRecipe guarda apenas a pontuação da busca que a gerou.
+
+
+# Função para traduzir de uma vez as receitas que ainda não foram traduzidas
+def translate_many(recipes):
+    pending = {recipe.id: recipe for recipe in recipes
+               if recipe_cache.shared.get((recipe.id, 'pt')) is None}
+    if not pending:
+        return None
+
+    copies = [recipe.base.to_meal() for recipe in pending.values()]
+    stats = translation.translate_recipes(copies)
+    for recipe_data in copies:
+        translated = recipe_cache.put_meal(recipe_data, lang='pt')
+        # A busca textual passa a encontrar a receita pelos termos em português
+        text_index.on_translated(pending[recipe_data['idMeal']].base, translated)
+    return stats
+
+
+# Função para obter o título em português sem acessar a rede (usa apenas o
+# que já foi traduzido ou está no cache de traduções)
+def cached_title(recipe):
+    translated = recipe_cache.shared.get((recipe.id, 'pt'))
+    if translated is not None:
+        return translated.name
+    title = recipe.base.name
+    try:
+        return translation_cache.get('en', 'pt', title) or title
+    except Exception:
+        return title
+
+
+class LazyRecipe:
+    KEYS = ('data', 'ingredients', 'matches', 'total')
+
+    def __init__(self, base, matches=0, total=None):
+        self.base = base
+        self.id = base.id
+        self.ingredients_en = [ing.lower() for ing in base.ingredients]
+        self.matches = matches
+        self.total = len(self.ingredients_en) if total is None else total
+        # Preenchidos pela busca: ids do índice de ingredientes e bitset do usuário
+        self.ingredient_ids = None
+        self.user_mask = 0
+        # Ou, vindo de uma referência, o bitset das posições que o usuário possui
+        self.matched_positions = None
+
+    # Indica, para cada ingrediente da receita, se o usuário o possui
+    def ingredient_matches(self):
+        if self.ingredient_ids is None:
+            mask = self.matched_positions or 0
+            return [bool(mask >> position & 1) for position in range(len(self.ingredients_en))]
+        return [ingredient_id is not None and bool(self.user_mask >> ingredient_id & 1)
+                for ingredient_id in self.ingredient_ids]
+
+    # Receita traduzida (memorizada no cache compartilhado); se a tradução
+    # falhar, usa a original
+    def translated(self):
+        recipe = recipe_cache.shared.get((self.id, 'pt'))
+        if recipe is None:
+            try:
+                translate_many([self])
+            except Exception:
+                return self.base
+            recipe = recipe_cache.shared.get((self.id, 'pt')) or self.base
+        return recipe
+
+    @property
+    def data(self):
+        return self.translated().to_meal()
+
+    @property
+    def ingredients(self):
+        return [ing.lower() for ing in self.translated().ingredients]
+
+    @property
+    def is_translated(self):
+        return recipe_cache.shared.get((self.id, 'pt')) is not None
+
+    # Referência leve guardada no estado da sessão
+    def ref(self):
+        ref = {'id': self.id, 'matches': self.matches, 'total': self.total}
+        if self.ingredient_ids is not None:
+            ref['matched'] = sum(1 << position for position, is_match in enumerate(self.ingredient_matches())
+                                 if is_match)
+        return ref
+
+    # Acesso no formato de dicionário usado pela interface
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+    def __eq__(self, other):
+        return isinstance(other, LazyRecipe) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"LazyRecipe({self.id!r}, {self.base.name!r}, {self.matches}/{self.total})"
+
+
+# Função para montar a receita a partir do id (cache compartilhado ou
+# catálogo). Retorna None se a receita não estiver disponível localmente.
+def load(recipe_id, matches=0, total=None):
+    base = recipe_cache.get_recipe(recipe_id)
+    if base is None:
+        return None
+    return LazyRecipe(base, matches, total)
+
+
+def from_ref(ref):
+    recipe = load(ref['id'], ref.get('matches', 0), ref.get('total'))
+    if recipe is not None:
+        recipe.matched_positions = ref.get('matched')
+    return recipe
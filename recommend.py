@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+import catalog
+import ingredient_index
+
+# Recomendações sem chamadas externas: cada receita do catálogo local vira
+# uma linha de uma matriz receita x ingrediente (0/1, normalizada para
+# norma 1), então a similaridade de cosseno com todas as receitas é um único
+# produto matriz-vetor. A matriz cresce aos poucos: refresh() só lê as
+# receitas gravadas ou removidas no catálogo depois da última leitura.
+#   RECEITA_RECOMMEND_REFRESH=30   intervalo mínimo entre leituras (segundos)
+#
+# Uma matriz densa de float32 basta para o catálogo do TheMealDB (centenas de
+# receitas x poucos milhares de ingredientes, alguns MB).
+
+REFRESH_INTERVAL = float(os.environ.get("RECEITA_RECOMMEND_REFRESH", "30"))
+# Nota neutra: avaliações acima aproximam, abaixo afastam
+NEUTRAL_RATING = 3
+
+
+class RecommendationEngine:
+    def __init__(self, index=None, rows=256, cols=256):
+        self.index = index
+        self.ids = []        # linha -> id da receita
+        self.rows = {}       # id da receita -> linha
+        self.columns = 0     # colunas em uso (ids de ingrediente)
+        self.matrix = np.zeros((rows, cols), dtype=np.float32)
+        self.watermark = 0
+        self.refreshed_at = 0
+        self._lock = threading.RLock()
+
+    def _get_index(self):
+        if self.index is None:
+            self.index = ingredient_index.get_index()
+        return self.index
+
+    # Dobra linhas e/ou colunas da matriz quando necessário
+    def _ensure_capacity(self, rows, cols):
+        current_rows, current_cols = self.matrix.shape
+        if rows <= current_rows and cols <= current_cols:
+            return
+        while current_rows < rows:
+            current_rows *= 2
+        while current_cols < cols:
+            current_cols *= 2
+        matrix = np.zeros((current_rows, current_cols), dtype=np.float32)
+        matrix[:self.matrix.shape[0], :self.matrix.shape[1]] = self.matrix
+        self.matrix = matrix
+
+    # Função para incluir (ou atualizar) uma receita a partir dos nomes dos
+    # seus ingredientes
+    def add(self, recipe_id, ingredients):
+        ingredient_ids = sorted({i for i in self._get_index().recipe_ids(ingredients) if i is not None})
+        with self._lock:
+            row = self.rows.get(recipe_id)
+            if ingredient_ids:
+                self.columns = max(self.columns, ingredient_ids[-1] + 1)
+            if row is None:
+                row = len(self.ids)
+                self._ensure_capacity(row + 1, self.columns)
+                self.ids.append(recipe_id)
+                self.rows[recipe_id] = row
+            else:
+                self._ensure_capacity(row + 1, self.columns)
+                self.matrix[row] = 0
+            if ingredient_ids:
+                self.matrix[row, ingredient_ids] = 1 / np.sqrt(len(ingredient_ids))
+
+    def add_many(self, recipes):
+        for recipe_id, ingredients in recipes:
+            self.add(recipe_id, ingredients)
+
+    # Função para tirar uma receita da matriz (a última linha ocupa o lugar)
+    def remove(self, recipe_id):
+        with self._lock:
+            row = self.rows.pop(recipe_id, None)
+            if row is None:
+                return
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.rows[moved] = row
+                self.matrix[row] = self.matrix[last]
+            self.ids.pop()
+            self.matrix[last] = 0
+
+    # Função para trazer as receitas novas, alteradas ou removidas do
+    # catálogo local
+    def refresh(self, force=False):
+        if not force and time.time() - self.refreshed_at < REFRESH_INTERVAL:
+            return 0
+        with self._lock:
+            self.refreshed_at = time.time()
+            recipes, deleted, self.watermark = catalog.meal_ingredients_since(self.watermark)
+            for recipe_id in deleted:
+                self.remove(recipe_id)
+            self.add_many(recipes.items())
+        return len(recipes) + len(deleted)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Função para escolher as k maiores notas (sem ordenar o vetor inteiro)
+    def _top_k(self, scores, k, exclude=()):
+        for row in exclude:
+            scores[row] = -np.inf
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.ids[row], float(scores[row])) for row in top]
+
+    # Receitas com ingredientes mais parecidos com os da receita informada.
+    # Retorna [(id, similaridade)], da mais parecida para a menos.
+    def similar(self, recipe_id, k=5):
+        self.refresh()
+        with self._lock:
+            row = self.rows.get(recipe_id)
+            if row is None:
+                return []
+            matrix = self.matrix[:len(self.ids), :self.columns]
+            scores = matrix @ matrix[row]
+            return self._top_k(scores, k, exclude=(row,))
+
+    # Receitas recomendadas a partir das avaliações ({id: nota de 1 a 5}):
+    # o perfil é a soma das receitas avaliadas, pesadas pela distância da
+    # nota neutra. As receitas já avaliadas ficam de fora.
+    def recommend(self, ratings, k=10):
+        self.refresh()
+        with self._lock:
+            rated = [(self.rows[recipe_id], rating) for recipe_id, rating in ratings.items()
+                     if recipe_id in self.rows]
+            if not rated:
+                return []
+            rows = np.array([row for row, _ in rated])
+            weights = np.array([rating - NEUTRAL_RATING for _, rating in rated], dtype=np.float32)
+            if not weights.any():
+                weights = np.array([rating for _, rating in rated], dtype=np.float32)
+            matrix = self.matrix[:len(self.ids), :self.columns]
+            profile = weights @ matrix[rows]
+            norm = np.linalg.norm(profile)
+            if not norm:
+                return []
+            scores = matrix @ (profile / norm)
+            return self._top_k(scores, k, exclude=rows)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'recipes': len(self.ids),
+                'ingredients': self.columns,
+                'bytes': int(self.matrix.nbytes),
+                'watermark': self.watermark,
+            }
+
+
+# Motor único por processo
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RecommendationEngine()
+    return _engine
+
+
+def similar(recipe_id, k=5):
+    return get_engine().similar(recipe_id, k)
+
+
+def recommend(ratings, k=10):
+    return get_engine().recommend(ratings, k)
@@ -0,0 +1,215 @@
+import heapq
+from collections import Counter
+
+import areas
+import catalog
+import fetch_engine
+import ingredient_index
+import mealdb
+import metrics
+import recipe_cache
+import recipes as recipes_mod
+import translation
+
+# Busca, ranking e tradução sem depender da interface: usada pelo app
+# Streamlit, pelo processamento em lote (batch.py) e pelos benchmarks. Nada
+# aqui usa st.*; erros de tradução são propagados para quem chamou.
+
+# Máximo de receitas cujos detalhes são buscados em uma pesquisa
+MAX_FETCH = 50
+
+
+# Função para contar em quantas listas de ingredientes (listas de ids) cada
+# receita aparece
+def count_candidates(id_lists):
+    counts = Counter()
+    for meal_ids in id_lists:
+        counts.update(set(meal_ids))
+    return counts
+
+
+# Função para ordenar os candidatos (mais listas primeiro) usando um heap
+def rank_candidates(counts, limit=MAX_FETCH):
+    return heapq.nlargest(limit, counts.items(), key=lambda item: (item[1], item[0]))
+
+
+# Função para ordenar os candidatos pela chave final (recipe_sort_key),
+# calculada com os ingredientes do catálogo local, sem buscar detalhes.
+# Retorna [(id, chave)] com as `limit` melhores.
+def rank_local(meal_ids, index, user_mask, area=None, limit=MAX_FETCH):
+    keys = {}
+    for meal_id, ingredients in catalog.ingredients_by_meal(meal_ids, area).items():
+        matches = sum(ingredient_id is not None and bool(user_mask >> ingredient_id & 1)
+                      for ingredient_id in index.recipe_ids(ingredients))
+        keys[meal_id] = (matches / len(ingredients), matches)
+    return heapq.nlargest(limit, keys.items(), key=lambda item: (item[1], item[0]))
+
+
+# Função para traduzir um termo do usuário (português -> inglês)
+def translate_pt_en(text):
+    return translation.translate(text, 'pt', 'en')
+
+
+# Função para buscar detalhes de uma receita
+def fetch_recipe_details(recipe_id):
+    for result in fetch_recipes_details([recipe_id]):
+        return result
+    return None
+
+
+# Função para buscar detalhes de várias receitas, entregando (id, receita
+# compacta) à medida que chegam: primeiro as do cache compartilhado e do
+# catálogo local, depois as da API
+def fetch_recipes_details(recipe_ids, cancel=None):
+    missing = []
+    for recipe_id in recipe_ids:
+        recipe = recipe_cache.get_recipe(recipe_id)
+        if recipe is not None:
+            metrics.count('recipes.local')
+            yield recipe_id, recipe
+        else:
+            missing.append(recipe_id)
+    metrics.count('recipes.remote', len(missing))
+
+    urls = {mealdb.api_url("lookup.php", i=recipe_id): recipe_id for recipe_id in missing}
+    for url, response in fetch_engine.get_engine().fetch_many(urls, cancel=cancel):
+        if not response or not response.get('meals'):
+            continue
+        recipe_data = response['meals'][0]
+        try:
+            catalog.upsert_meal(recipe_data)
+        except Exception:
+            pass
+        yield urls[url], recipe_cache.put_meal(recipe_data)
+
+
+# Função para pontuar uma receita com os dados originais (em inglês); a
+# tradução só acontece quando a receita for exibida. total é o número de
+# ingredientes listados e matches quantos deles o usuário possui (as linhas
+# ✅/❌ exibidas); o bitset da receita descarta de cara as sem interseção.
+def score_recipe(recipe, index, user_mask):
+    recipe_object = recipes_mod.LazyRecipe(recipe)
+    recipe_object.ingredient_ids = index.recipe_ids(recipe.ingredients)
+    recipe_object.user_mask = user_mask
+
+    if index.recipe_mask(recipe_object.ingredient_ids) & user_mask:
+        recipe_object.matches = sum(recipe_object.ingredient_matches())
+    recipe_object.total = len(recipe_object.ingredient_ids)
+    return recipe_object
+
+
+def recipe_sort_key(recipe):
+    return (recipe['matches']/recipe['total'], recipe['matches'])
+
+
+# Função para resolver os ingredientes do usuário no índice (sinônimos em
+# português ou tradução). Retorna (nomes em inglês, bitset do usuário).
+def resolve_ingredients(user_ingredients, index=None, translate=translate_pt_en):
+    index = index or ingredient_index.get_index()
+    translated_ingredients = []
+    user_mask = 0
+    for ing in user_ingredients:
+        english, mask = index.resolve(ing.lower().strip(), translate=translate)
+        translated_ingredients.append(english)
+        user_mask |= mask
+    return translated_ingredients, user_mask
+
+
+# Função para buscar receitas por ingredientes. on_progress, se informado,
+# recebe a lista parcial de receitas a cada resultado que chega.
+def find_recipes(user_ingredients, area=None, max_recipes=10, on_progress=None):
+    with metrics.span('resolve'):
+        index = ingredient_index.get_index()
+        translated_ingredients, user_mask = resolve_ingredients(user_ingredients, index)
+
+    with metrics.span('filter'):
+        id_lists = ingredient_meal_ids(translated_ingredients)
+
+    if area == areas.ALL_LABEL:
+        area = None
+
+    # Com o catálogo local a chave final de cada candidato já é conhecida e
+    # só as max_recipes melhores são buscadas. Sem ele, a pontuação só sai
+    # depois de buscar os detalhes, então o pré-ranking (receitas que
+    # aparecem em mais listas primeiro) escolhe as MAX_FETCH buscadas.
+    with metrics.span('rank'):
+        if catalog.is_loaded():
+            ranked = rank_local(count_candidates(id_lists), index, user_mask, area, max_recipes)
+        else:
+            ranked = rank_candidates(count_candidates(id_lists))
+    if not ranked:
+        return []
+
+    recipes = []
+    with metrics.span('details'):
+        for _, recipe in fetch_recipes_details([meal_id for meal_id, _ in ranked]):
+            if area and recipe.area != area:
+                continue
+
+            with metrics.span('match'):
+                recipe_object = score_recipe(recipe, index, user_mask)
+            if recipe_object.total:
+                recipes.append(recipe_object)
+                if on_progress:
+                    on_progress(recipes)
+
+    # Ordena por compatibilidade e limita resultados
+    recipes.sort(key=recipe_sort_key, reverse=True)
+    return recipes[:max_recipes]
+
+
+# Função para traduzir de uma vez as receitas encontradas (as que já foram
+# traduzidas vêm do cache compartilhado)
+def translate_results(recipes):
+    with metrics.span('translate'):
+        return recipes_mod.translate_many(recipes)
+
+
+# Função para listar, para cada ingrediente, os ids das receitas que o usam
+# (catálogo local ou API, com as respostas guardadas no cache de requisições)
+def ingredient_meal_ids(ingredients):
+    ingredients = list(dict.fromkeys(ingredients))
+    if catalog.is_loaded():
+        return [catalog.meal_ids_by_ingredient(ingredient) for ingredient in ingredients]
+
+    urls = [mealdb.api_url("filter.php", i=ingredient) for ingredient in ingredients]
+    return [[meal['idMeal'] for meal in data['meals']]
+            for data in fetch_engine.get_engine().fetch_all(urls).values() if data and data.get('meals')]
+
+
+# Função para listar os ids das receitas de um país (catálogo local ou API,
+# com a resposta da API guardada no cache de requisições)
+def area_meal_ids(area):
+    if catalog.is_loaded():
+        return catalog.meal_ids_by_area(area)
+
+    data = fetch_engine.get_engine().fetch_all([mealdb.api_url("filter.php", a=area)])
+    data = next(iter(data.values()), None)
+    if not data or not data.get('meals'):
+        return []
+    return [meal['idMeal'] for meal in data['meals']]
+
+
+# Função para montar as receitas de uma lista de ids, na mesma ordem
+def load_recipes(meal_ids):
+    details = dict(fetch_recipes_details(meal_ids))
+    return [recipes_mod.LazyRecipe(details[meal_id]) for meal_id in meal_ids if meal_id in details]
+
+
+# Função para buscar uma página das receitas de um país (sem traduzir).
+# Retorna (receitas da página, total do país, ids da próxima página).
+def area_page(area, page=0, page_size=5):
+    with metrics.span('area_ids'):
+        meal_ids = area_meal_ids(area)
+    start = page * page_size
+    with metrics.span('details'):
+        page_recipes = load_recipes(meal_ids[start:start + page_size])
+    return page_recipes, len(meal_ids), meal_ids[start + page_size:start + 2 * page_size]
+
+
+# Função para buscar lista de países (traduzida)
+def area_labels():
+    try:
+        return areas.get_registry().labels()
+    except Exception:
+        return [areas.ALL_LABEL]
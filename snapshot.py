@@ -0,0 +1,339 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+import catalog
+import recipe_cache
+import translation_cache
+
+# Snapshots do catálogo processado, para subir o app sem refazer os caches
+# pela rede: receitas (campos do recipe_cache, ingredientes e medidas),
+# listas, nomes dos países, traduções e estado da sincronização, em colunas
+# NumPy dentro de um .npz. Textos viram um bloco UTF-8 com separadores;
+# colunas com poucos valores distintos (categoria, país, ingredientes,
+# medidas...) viram dicionário + códigos inteiros.
+#   python snapshot.py export catalogo.snap
+#   python snapshot.py import catalogo.snap
+#   python snapshot.py diff v1.snap v2.snap v1-v2.snap   (delta aplicável sobre v1)
+#   python snapshot.py info catalogo.snap
+#   RECEITA_SNAPSHOT=arquivo   importado ao iniciar o app, se ainda não aplicado
+#
+# Cada snapshot tem um id (hash do conteúdo); o catálogo registra os ids
+# aplicados, e um delta só é aplicado sobre o snapshot de que partiu.
+
+SNAPSHOT_PATH = os.environ.get("RECEITA_SNAPSHOT", "")
+FORMAT = 2
+
+# Atributos de recipe_cache.Recipe gravados como texto livre ou como dicionário
+TEXT_COLUMNS = ('id', 'name', 'instructions', 'thumb', 'source', 'youtube')
+CATEGORICAL_COLUMNS = ('category', 'area', 'tags')
+
+
+# Colunas de texto: bloco UTF-8 com os textos separados por SEPARATOR, mais
+# o tamanho de cada um. A leitura é um único split; os tamanhos só são usados
+# se algum texto contiver o separador.
+SEPARATOR = '\0'
+
+
+def _put_strings(arrays, name, values):
+    values = list(values)
+    arrays[f"{name}.chars"] = np.frombuffer(SEPARATOR.join(values).encode('utf-8'), dtype=np.uint8)
+    arrays[f"{name}.lengths"] = np.array([len(value) for value in values], dtype=np.int64)
+
+
+def _get_strings(data, name):
+    text = data[f"{name}.chars"].tobytes().decode('utf-8')
+    lengths = data[f"{name}.lengths"]
+    if not len(lengths):
+        return []
+    values = text.split(SEPARATOR)
+    if len(values) == len(lengths):
+        return values
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])).tolist()
+    return [text[start:start + length] for start, length in zip(starts, lengths.tolist())]
+
+
+def _put_categorical(arrays, name, values):
+    values = list(values)
+    codes = {}
+    arrays[f"{name}.codes"] = np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int32)
+    _put_strings(arrays, f"{name}.values", codes)
+
+
+def _get_categorical(data, name):
+    values = np.array(_get_strings(data, f"{name}.values"), dtype=object)
+    return values[data[f"{name}.codes"]].tolist()
+
+
+def _put_json(arrays, name, value):
+    arrays[name] = np.frombuffer(json.dumps(value, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+
+
+def _get_json(data, name):
+    return json.loads(data[name].tobytes().decode('utf-8'))
+
+
+# Receita no formato da API, só com os campos que o app usa (a mesma forma
+# gravada no catálogo)
+def processed_meal(meal):
+    return catalog.compact_meal(meal)
+
+
+def meal_hash(meal):
+    digest = hashlib.sha1(json.dumps(meal, sort_keys=True).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class Snapshot:
+    def __init__(self, meals=None, deleted=(), translations=None, areas=None, lists=None, sync=None,
+                 kind='full', base=None, snapshot_id=None, created_at=None):
+        self.meals = meals or {}                # id -> receita (formato da API)
+        self.deleted = list(deleted)            # ids removidos (só em deltas)
+        self.translations = translations or {}  # (origem, destino, texto) -> (tradução, fixa)
+        self.areas = areas or {}                # país em inglês -> rótulo em português
+        self.lists = lists or {}                # tipo -> nomes
+        self.sync = sync or {}                  # parte do catálogo -> sincronizada em
+        self.kind = kind
+        self.base = base
+        self.created_at = created_at or time.time()
+        self._hashes = None
+        self.id = snapshot_id
+
+    @property
+    def hashes(self):
+        if self._hashes is None:
+            self._hashes = {meal_id: meal_hash(meal) for meal_id, meal in self.meals.items()}
+        return self._hashes
+
+    def to_arrays(self):
+        arrays = {}
+        meal_ids = sorted(self.meals)
+        recipes = [recipe_cache.Recipe.from_meal(self.meals[meal_id]) for meal_id in meal_ids]
+        for column in TEXT_COLUMNS:
+            _put_strings(arrays, f"meal.{column}", (getattr(recipe, column) for recipe in recipes))
+        for column in CATEGORICAL_COLUMNS:
+            _put_categorical(arrays, f"meal.{column}", (getattr(recipe, column) for recipe in recipes))
+        arrays['meal.hash'] = np.array([self.hashes[meal_id] for meal_id in meal_ids], dtype=np.uint64)
+        offsets = np.zeros(len(recipes) + 1, dtype=np.int32)
+        np.cumsum(np.array([len(recipe.ingredients) for recipe in recipes], dtype=np.int32), out=offsets[1:])
+        arrays['meal.ingredient_offsets'] = offsets
+        _put_categorical(arrays, 'ingredient', (ing for recipe in recipes for ing in recipe.ingredients))
+        _put_categorical(arrays, 'measure', (measure for recipe in recipes for measure in recipe.measures))
+        _put_strings(arrays, 'deleted.id', sorted(self.deleted))
+
+        keys = sorted(self.translations)
+        _put_categorical(arrays, 'translation.source', (source for source, _, _ in keys))
+        _put_categorical(arrays, 'translation.target', (target for _, target, _ in keys))
+        _put_strings(arrays, 'translation.text', (text for _, _, text in keys))
+        _put_strings(arrays, 'translation.translated', (self.translations[key][0] for key in keys))
+        arrays['translation.pinned'] = np.array([self.translations[key][1] for key in keys], dtype=np.bool_)
+
+        _put_strings(arrays, 'area.en', sorted(self.areas))
+        _put_strings(arrays, 'area.pt', (self.areas[en] for en in sorted(self.areas)))
+        lists = [(kind, name) for kind in sorted(self.lists) for name in self.lists[kind]]
+        _put_categorical(arrays, 'list.kind', (kind for kind, _ in lists))
+        _put_strings(arrays, 'list.name', (name for _, name in lists))
+        _put_strings(arrays, 'sync.key', sorted(self.sync))
+        arrays['sync.at'] = np.array([self.sync[key] for key in sorted(self.sync)], dtype=np.float64)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data):
+        meta = _get_json(data, 'meta')
+        if meta.get('format') != FORMAT:
+            raise ValueError(f"Formato de snapshot não suportado: {meta.get('format')}")
+
+        columns = {column: _get_strings(data, f"meal.{column}") for column in TEXT_COLUMNS}
+        columns.update({column: _get_categorical(data, f"meal.{column}") for column in CATEGORICAL_COLUMNS})
+        offsets = data['meal.ingredient_offsets'].tolist()
+        ingredients = _get_categorical(data, 'ingredient')
+        measures = _get_categorical(data, 'measure')
+        # Monta as receitas na forma de catalog.compact_meal, sem criar objetos
+        fields = list(recipe_cache.FIELDS)
+        ingredient_keys = [f'strIngredient{i}' for i in range(1, 21)]
+        measure_keys = [f'strMeasure{i}' for i in range(1, 21)]
+        meals = {}
+        rows = zip(*(columns[attr] for attr in recipe_cache.FIELDS.values()))
+        for values, start, end in zip(rows, offsets, offsets[1:]):
+            meal = dict(zip(fields, values))
+            meal.update(zip(ingredient_keys, ingredients[start:end]))
+            meal.update(zip(measure_keys, measures[start:end]))
+            meals[values[0]] = meal
+
+        keys = zip(_get_categorical(data, 'translation.source'), _get_categorical(data, 'translation.target'),
+                   _get_strings(data, 'translation.text'))
+        entries = zip(_get_strings(data, 'translation.translated'), data['translation.pinned'].tolist())
+        translations = dict(zip(keys, entries))
+        lists = {}
+        for kind, name in zip(_get_categorical(data, 'list.kind'), _get_strings(data, 'list.name')):
+            lists.setdefault(kind, []).append(name)
+
+        snapshot = cls(
+            meals, _get_strings(data, 'deleted.id'), translations,
+            dict(zip(_get_strings(data, 'area.en'), _get_strings(data, 'area.pt'))), lists,
+            dict(zip(_get_strings(data, 'sync.key'), data['sync.at'].tolist())),
+            meta['kind'], meta.get('base'), meta['id'], meta.get('created_at'),
+        )
+        snapshot._hashes = dict(zip(columns['id'], data['meal.hash'].tolist()))
+        return snapshot
+
+    # Id de um snapshot completo: hash das colunas (não depende da data)
+    @staticmethod
+    def content_id(arrays):
+        digest = hashlib.sha256()
+        for name in sorted(arrays):
+            digest.update(name.encode('utf-8'))
+            digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+        return digest.hexdigest()[:16]
+
+    def write(self, path, compress=False):
+        arrays = self.to_arrays()
+        if self.kind == 'full':
+            self.id = self.content_id(arrays)
+        meta = {'format': FORMAT, 'kind': self.kind, 'id': self.id, 'base': self.base,
+                'created_at': self.created_at, 'meals': len(self.meals), 'deleted': len(self.deleted),
+                'translations': len(self.translations)}
+        _put_json(arrays, 'meta', meta)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            (np.savez_compressed if compress else np.savez)(f, **arrays)
+        os.replace(tmp, path)
+        return meta
+
+    def summary(self):
+        return {'id': self.id, 'kind': self.kind, 'base': self.base, 'created_at': self.created_at,
+                'meals': len(self.meals), 'deleted': len(self.deleted), 'translations': len(self.translations),
+                'areas': len(self.areas), 'lists': {kind: len(names) for kind, names in self.lists.items()}}
+
+
+def read(path):
+    with np.load(path, allow_pickle=False) as data:
+        return Snapshot.from_arrays(data)
+
+
+# Lê só os metadados (id, tipo, base), sem carregar as colunas
+def read_meta(path):
+    with np.load(path, allow_pickle=False) as data:
+        return _get_json(data, 'meta')
+
+
+# Função para montar um snapshot completo a partir do catálogo local e do
+# cache de traduções
+def from_catalog():
+    meals = {meal['idMeal']: processed_meal(meal) for meal in catalog.all_meals()}
+    translations = {(source, target, text): (translated, pinned)
+                    for source, target, text, translated, pinned in translation_cache.all_entries()}
+    areas, _ = catalog.load_area_labels()
+    return Snapshot(meals, (), translations, areas, catalog.all_lists(), catalog.sync_state())
+
+
+def export(path, compress=False):
+    return from_catalog().write(path, compress)
+
+
+# Função para calcular o delta que leva o snapshot `old` ao `new`. As
+# traduções só são acrescentadas (o cache despeja as antigas sozinho).
+def diff(old, new):
+    meals = {meal_id: meal for meal_id, meal in new.meals.items()
+             if old.hashes.get(meal_id) != new.hashes[meal_id]}
+    deleted = [meal_id for meal_id in old.meals if meal_id not in new.meals]
+    translations = {key: value for key, value in new.translations.items() if old.translations.get(key) != value}
+    areas = new.areas if new.areas != old.areas else {}
+    lists = {kind: names for kind, names in new.lists.items() if old.lists.get(kind) != names}
+    sync = {key: at for key, at in new.sync.items() if old.sync.get(key) != at}
+    return Snapshot(meals, deleted, translations, areas, lists, sync, kind='delta', base=old.id,
+                    snapshot_id=new.id)
+
+
+# Função para aplicar um snapshot (completo ou delta) ao catálogo local e ao
+# cache de traduções. O completo é mesclado ao que já existe; o delta exige
+# que o snapshot de origem já tenha sido aplicado (salvo force=True).
+def apply(snapshot, force=False):
+    if snapshot.kind == 'delta' and not force and not catalog.has_snapshot(snapshot.base):
+        raise ValueError(f"O delta parte do snapshot {snapshot.base}, que não foi aplicado a este catálogo")
+
+    changed = catalog.upsert_meals(snapshot.meals.values())
+    catalog.delete_meals(snapshot.deleted)
+    groups = {}
+    for (source, target, text), (translated, pinned) in snapshot.translations.items():
+        groups.setdefault((source, target, pinned), []).append((text, translated))
+    for (source, target, pinned), pairs in groups.items():
+        translation_cache.put_many(source, target, pairs, pinned=pinned)
+    if snapshot.areas:
+        catalog.save_area_labels(snapshot.areas)
+    if snapshot.lists:
+        catalog.replace_lists(snapshot.lists)
+    if snapshot.sync:
+        catalog.merge_sync_state(snapshot.sync)
+    catalog.record_snapshot(snapshot.id, snapshot.kind, snapshot.base)
+    return {'id': snapshot.id, 'kind': snapshot.kind, 'meals_changed': changed,
+            'meals_deleted': len(snapshot.deleted), 'translations': len(snapshot.translations)}
+
+
+def import_file(path, force=False):
+    return apply(read(path), force)
+
+
+_startup_done = False
+_startup_lock = threading.Lock()
+
+
+# Importa RECEITA_SNAPSHOT ao iniciar (uma vez por processo), se ainda não
+# foi aplicado a este catálogo. Retorna o resumo da importação ou None.
+def import_on_startup(path=SNAPSHOT_PATH):
+    global _startup_done
+    with _startup_lock:
+        if _startup_done or not path or not os.path.exists(path):
+            return None
+        _startup_done = True
+        try:
+            if catalog.has_snapshot(read_meta(path)['id']):
+                return None
+            return import_file(path)
+        except Exception:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshots do catálogo local")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="grava o catálogo atual")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--compress', action='store_true', help="arquivo menor, leitura mais lenta")
+    import_parser = commands.add_parser('import', help="aplica um snapshot ou delta ao catálogo")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--force', action='store_true', help="aplica o delta mesmo sem a origem")
+    diff_parser = commands.add_parser('diff', help="grava o delta entre dois snapshots")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    diff_parser.add_argument('output')
+    info_parser = commands.add_parser('info', help="mostra o conteúdo de um snapshot")
+    info_parser.add_argument('path')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'export':
+        result = export(args.path, args.compress)
+    elif args.command == 'import':
+        result = import_file(args.path, args.force)
+    elif args.command == 'diff':
+        delta = diff(read(args.old), read(args.new))
+        if delta.id == delta.base:
+            # Mesmo conteúdo: não há delta a gravar
+            result = {'id': delta.id, 'kind': 'delta', 'base': delta.base, 'empty': True}
+        else:
+            result = delta.write(args.output)
+    else:
+        result = read(args.path).summary()
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    print(json.dumps(result, ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
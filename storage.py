@@ -0,0 +1,27 @@
+import sqlite3
+import threading
+
+# Conexões SQLite por thread (o sqlite3 não permite compartilhar uma conexão
+# entre threads sem travas externas)
+_local = threading.local()
+
+
+# Função para abrir (ou reaproveitar) a conexão da thread atual com um banco.
+# migrate, se informado, recebe cada conexão nova depois do schema.
+def open_db(path, schema, migrate=None):
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # WAL permite leituras concorrentes entre processos do Streamlit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(schema)
+        if migrate is not None:
+            migrate(conn)
+        conns[path] = conn
+    return conn
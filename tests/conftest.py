@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# Bancos e caches dos testes em uma pasta temporária, definidos antes de
+# importar os módulos do app (que leem as variáveis ao serem importados)
+_workdir = tempfile.mkdtemp(prefix='receita-tests-')
+os.environ['RECEITA_CATALOG_DB'] = os.path.join(_workdir, 'catalog.sqlite3')
+os.environ['RECEITA_TRANSLATION_DB'] = os.path.join(_workdir, 'translations.sqlite3')
+os.environ['RECEITA_IMAGE_CACHE'] = os.path.join(_workdir, 'images')
+os.environ['RECEITA_TEXT_INDEX'] = os.path.join(_workdir, 'text_index.json')
+os.environ['RECEITA_WARM'] = '0'
@@ -0,0 +1,64 @@
+import ingredient_index
+
+NAMES = ['Chicken', 'Chicken Breast', 'Tomatoes', 'Chopped Tomatoes', 'Onion']
+
+
+def bits(*ingredient_ids):
+    return ingredient_index.IngredientIndex.recipe_mask(ingredient_ids)
+
+
+def test_tokens_drop_plurals_accents_and_stopwords():
+    assert ingredient_index.tokens('Chopped Tomatoes') == ('chopped', 'tomato')
+    assert ingredient_index.tokens('Pimentões de Cheiro') == ('pimentao', 'cheiro')
+    assert ingredient_index.tokens('Eggs') == ingredient_index.tokens('egg')
+
+
+# Um termo cobre todos os ingredientes que contêm as suas palavras
+def test_resolve_prefix_masks():
+    index = ingredient_index.IngredientIndex(NAMES)
+    assert index.resolve('chicken') == ('Chicken', bits(0, 1))
+    assert index.resolve('tomato') == ('Tomatoes', bits(2, 3))
+    assert index.resolve('chicken breast') == ('Chicken Breast', bits(1))
+
+
+def test_resolve_synonyms_and_translation():
+    index = ingredient_index.IngredientIndex(NAMES, [('frango', 'chicken')])
+    translations = []
+
+    def translate(text):
+        translations.append(text)
+        return 'onion'
+
+    assert index.resolve('frango', translate=translate) == ('Chicken', bits(0, 1))
+    assert index.resolve('cebola', translate=translate) == ('Onion', bits(4))
+    # A tradução vira sinônimo: a segunda busca não traduz de novo
+    assert index.resolve('cebolas', translate=translate) == ('Onion', bits(4))
+    assert translations == ['cebola']
+
+
+def test_unknown_term_has_empty_mask():
+    index = ingredient_index.IngredientIndex(NAMES)
+    assert index.resolve('saffron') == ('saffron', 0)
+
+
+def test_recipe_ids_and_mask():
+    index = ingredient_index.IngredientIndex(NAMES)
+    ingredient_ids = index.recipe_ids(['Onion', 'Salt', ''])
+    assert ingredient_ids == [4, 5, None]
+    assert index.names[5] == 'Salt'
+    assert index.recipe_mask(ingredient_ids) == bits(4, 5)
+    assert index.resolve('salt')[1] & index.recipe_mask(ingredient_ids)
+
+
+# Compostos (caldo, molho, pimentão...) são outros ingredientes, a não ser
+# que a busca os peça
+def test_compounds_need_their_own_words():
+    index = ingredient_index.IngredientIndex(
+        ['Chicken', 'Chicken Breast', 'Chicken Stock', 'Pepper', 'Black Pepper', 'Red Pepper', 'Milk', 'Coconut Milk'],
+        [('frango', 'chicken'), ('pimenta', 'pepper'), ('caldo de galinha', 'chicken stock')]
+    )
+    assert index.resolve('frango') == ('Chicken', bits(0, 1))
+    assert index.resolve('pimenta') == ('Pepper', bits(3, 4))
+    assert index.resolve('milk') == ('Milk', bits(6))
+    assert index.resolve('caldo de galinha') == ('Chicken Stock', bits(2))
+    assert index.resolve('red pepper') == ('Red Pepper', bits(5))
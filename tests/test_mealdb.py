@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+import fetch_engine
+import mealdb
+from stub_mealdb import StubMealDB, synthetic_meals
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubMealDB(synthetic_meals(20)).start()
+    monkeypatch.setattr(mealdb, 'API_BASE', server.base_url)
+    monkeypatch.setattr(mealdb, 'breaker', mealdb.CircuitBreaker())
+    monkeypatch.setattr(mealdb, 'BACKOFF', 0)
+    mealdb.cache_clear()
+    yield server
+    server.stop()
+    mealdb.cache_clear()
+
+
+@pytest.fixture
+def engine():
+    engine = fetch_engine.FetchEngine()
+    yield engine
+    engine.close()
+
+
+def lookup(meal_id):
+    return mealdb.api_url("lookup.php", i=meal_id)
+
+
+# Uma chamada síncrona e uma do motor para a mesma URL, em qualquer ordem,
+# fazem uma única requisição
+@pytest.mark.parametrize('sync_first', [True, False])
+def test_sync_and_engine_share_request(stub, engine, sync_first):
+    stub.latency = 0.3
+    url = lookup('50001')
+
+    def sync():
+        return mealdb.cached_api_request(url)
+
+    def from_engine():
+        return engine.fetch_all([url])[url]
+
+    first, second = (sync, from_engine) if sync_first else (from_engine, sync)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(first()))
+    thread.start()
+    time.sleep(0.1)
+    data = second()
+    thread.join()
+
+    assert result == [data]
+    assert data['meals'][0]['idMeal'] == '50001'
+    assert stub.requests['lookup.php'] == 1
+
+
+def test_negative_cache_expires(stub, monkeypatch):
+    monkeypatch.setattr(mealdb, 'NEGATIVE_TTL', 0.2)
+    url = lookup('50002')
+
+    stub.status = 404
+    assert mealdb.cached_api_request(url) is None
+    stub.status = 200
+    assert mealdb.cached_api_request(url) is None
+    assert stub.requests['lookup.php'] == 1
+
+    time.sleep(0.25)
+    assert mealdb.cached_api_request(url)['meals'][0]['idMeal'] == '50002'
+    assert stub.requests['lookup.php'] == 2
+
+
+# Depois de BREAKER_THRESHOLD falhas o disjuntor abre; passado o intervalo,
+# uma única tentativa chega à API
+def test_breaker_opens_and_lets_one_trial_through(stub, monkeypatch):
+    monkeypatch.setattr(mealdb, 'RETRIES', 0)
+    monkeypatch.setattr(mealdb, 'breaker', mealdb.CircuitBreaker(threshold=3, cooldown=0.2))
+    stub.status = 503
+
+    for _ in range(3):
+        assert mealdb.fetch_json("lookup.php", i='50003') is None
+    assert mealdb.breaker.state == 'open'
+    assert mealdb.fetch_json("lookup.php", i='50003') is None
+    assert stub.requests['lookup.php'] == 3
+
+    time.sleep(0.25)
+    assert mealdb.fetch_json("lookup.php", i='50003') is None
+    assert mealdb.fetch_json("lookup.php", i='50003') is None
+    assert stub.requests['lookup.php'] == 4
+
+    stub.status = 200
+    time.sleep(0.25)
+    assert mealdb.fetch_json("lookup.php", i='50003')['meals'][0]['idMeal'] == '50003'
+    assert mealdb.breaker.state == 'closed'
+    assert stub.requests['lookup.php'] == 5
@@ -0,0 +1,48 @@
+import pytest
+
+import measures
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1 1/2 cups', ('1 1/2', 1.5, 'cup', '')),
+    ('200g', ('200', 200.0, 'g', '')),
+    ('1.5kg', ('1.5', 1.5, 'kg', '')),
+    ('1,5 l', ('1,5', 1.5, 'l', '')),
+    ('½ tsp', ('½', 0.5, 'tsp', '')),
+    ('2-3 cloves', ('2-3', 2.0, 'clove', '')),
+    ('2 tbsp chopped', ('2', 2.0, 'tbsp', 'chopped')),
+    ('3 Large', ('3', 3.0, None, 'Large')),
+    ('pinch', (None, None, 'pinch', '')),
+    ('to taste', (None, None, None, 'to taste')),
+    ('', (None, None, None, '')),
+    ('1 cup\nflour\nsifted', ('1', 1.0, 'cup', 'flour\nsifted')),
+])
+def test_parse_measure(text, expected):
+    assert tuple(measures.parse_measure(text)) == expected
+
+
+# "l" e "g" soltos no início de uma palavra não são unidades
+def test_unit_letter_without_amount_is_text():
+    assert measures.parse_measure('l leaves') == (None, None, None, 'l leaves')
+    assert measures.parse_measure('garlic') == (None, None, None, 'garlic')
+
+
+def test_parse_amount():
+    assert measures.parse_amount('1 1/2') == 1.5
+    assert measures.parse_amount('1½') == 1.5
+    assert measures.parse_amount('1/0') == 0
+    assert measures.parse_amount(None) is None
+
+
+def test_to_metric():
+    assert measures.to_metric(measures.parse_measure('2 cups')).amount == '480'
+    assert measures.to_metric(measures.parse_measure('4 oz')) == ('113', pytest.approx(113.4), 'g', '')
+    assert measures.to_metric(measures.parse_measure('200g')) is None
+    assert measures.to_metric(measures.parse_measure('pinch')) is None
+
+
+def test_to_portuguese():
+    assert measures.to_portuguese(measures.parse_measure('1 cup'), metric=False) == '1 xícara'
+    assert measures.to_portuguese(measures.parse_measure('2 cups'), metric=True) == '2 xícaras (≈480 ml)'
+    assert measures.to_portuguese(measures.parse_measure('2 tbsp chopped'), 'picado', metric=False) == \
+        '2 colheres de sopa picado'
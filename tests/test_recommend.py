@@ -0,0 +1,53 @@
+import pytest
+
+import catalog
+import ingredient_index
+import recommend
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_PATH', str(tmp_path / 'catalog.sqlite3'))
+
+
+def meal(meal_id, *ingredients):
+    data = {'idMeal': meal_id, 'strMeal': f"Meal {meal_id}"}
+    for i, ingredient in enumerate(ingredients, 1):
+        data[f'strIngredient{i}'] = ingredient
+    return data
+
+
+def engine():
+    return recommend.RecommendationEngine(ingredient_index.IngredientIndex())
+
+
+# Receitas removidas do catálogo saem da matriz e não ocupam vagas do top-k
+def test_deleted_meals_leave_the_matrix():
+    catalog.upsert_meals([meal('1', 'Chicken', 'Rice'), meal('2', 'Chicken', 'Rice', 'Peas'),
+                          meal('3', 'Chicken', 'Salt'), meal('4', 'Beef')])
+    recommendations = engine()
+    recommendations.refresh(force=True)
+    assert [recipe_id for recipe_id, _ in recommendations.similar('1', k=1)] == ['2']
+
+    catalog.delete_meals(['2'])
+    assert recommendations.refresh(force=True) == 1
+
+    assert len(recommendations) == 3
+    assert [recipe_id for recipe_id, _ in recommendations.similar('1')] == ['3']
+    assert recommendations.similar('2') == []
+
+
+def test_deletion_is_reported_once():
+    catalog.upsert_meals([meal('1', 'Chicken')])
+    _, _, watermark = catalog.meal_ingredients_since()
+    catalog.delete_meals(['1', 'missing'])
+
+    recipes, deleted, latest = catalog.meal_ingredients_since(watermark)
+    assert (recipes, deleted) == ({}, ['1'])
+    assert latest > watermark
+    assert catalog.meal_ingredients_since(latest) == ({}, [], latest)
+
+    # Se a receita voltar, deixa de constar como removida
+    catalog.upsert_meals([meal('1', 'Chicken')])
+    recipes, deleted, _ = catalog.meal_ingredients_since(latest)
+    assert (list(recipes), deleted) == (['1'], [])
@@ -0,0 +1,119 @@
+import pytest
+
+import catalog
+import ingredient_index
+import recipe_cache
+import search
+
+
+def meal(meal_id, ingredients, area='British'):
+    data = {'idMeal': meal_id, 'strMeal': f"Meal {meal_id}", 'strArea': area}
+    for i, ingredient in enumerate(ingredients, 1):
+        data[f'strIngredient{i}'] = ingredient
+        data[f'strMeasure{i}'] = '1'
+    return data
+
+
+# Catálogo local carregado com as receitas informadas; devolve a lista dos
+# ids cujos detalhes a busca carregou
+@pytest.fixture
+def local_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_PATH', str(tmp_path / 'catalog.sqlite3'))
+    monkeypatch.setattr(catalog, 'is_loaded', lambda: True)
+    monkeypatch.setattr(ingredient_index, '_index_complete', True)
+    loaded = []
+    fetch_recipes_details = search.fetch_recipes_details
+
+    def recording(recipe_ids, cancel=None):
+        loaded.extend(recipe_ids)
+        return fetch_recipes_details(recipe_ids, cancel)
+
+    monkeypatch.setattr(search, 'fetch_recipes_details', recording)
+
+    def load(meals):
+        catalog.upsert_meals(meals)
+        names = sorted({name for data in meals for name, _ in catalog.meal_ingredients(data)})
+        monkeypatch.setattr(ingredient_index, '_index', ingredient_index.IngredientIndex(names))
+        return loaded
+    return load
+
+
+# 30 receitas com os dois ingredientes do usuário entre 20 (2/20) e 10 com
+# só um deles (1/1): as de uma lista vêm depois no pré-ranking, mas são as
+# mais compatíveis, e só os detalhes delas são carregados
+def test_local_ranking_uses_final_key(local_catalog):
+    filler = [f"Filler {n}" for n in range(18)]
+    meals = [meal(f"b{n:02d}", ['Chicken', 'Garlic'] + filler) for n in range(30)]
+    meals += [meal(f"s{n}", ['Chicken']) for n in range(10)]
+    loaded = local_catalog(meals)
+
+    results = search.find_recipes(['chicken', 'garlic'], max_recipes=10)
+
+    assert sorted(recipe.id for recipe in results) == [f"s{n}" for n in range(10)]
+    assert [(recipe.matches, recipe.total) for recipe in results] == [(1, 1)] * 10
+    assert sorted(loaded) == sorted(recipe.id for recipe in results)
+
+
+def test_local_ranking_filters_area(local_catalog):
+    meals = [meal('a1', ['Chicken'], 'Thai'), meal('a2', ['Chicken', 'Rice'], 'British'),
+             meal('a3', ['Chicken', 'Salt'], 'Thai')]
+    loaded = local_catalog(meals)
+
+    results = search.find_recipes(['chicken'], area='Thai', max_recipes=5)
+
+    assert [recipe.id for recipe in results] == ['a1', 'a3']
+    assert sorted(loaded) == ['a1', 'a3']
+
+
+# "Egg" e "Eggs" são o mesmo ingrediente no índice, mas a receita lista os
+# dois: total e matches contam os ingredientes listados (as linhas exibidas)
+def test_score_counts_listed_ingredients():
+    index = ingredient_index.IngredientIndex(['Egg', 'Milk', 'Flour'])
+    recipe = recipe_cache.Recipe('1', 'Omelette', ingredients=['Egg', 'Eggs', 'Flour', 'Salt'],
+                                 measures=['1', '2', '100g', 'pinch'])
+    _, user_mask = search.resolve_ingredients(['ovos'], index, translate=lambda text: 'eggs')
+
+    scored = search.score_recipe(recipe, index, user_mask)
+
+    assert (scored.matches, scored.total) == (2, 4)
+    assert scored.ingredient_matches() == [True, True, False, False]
+
+
+def test_score_without_common_ingredients():
+    index = ingredient_index.IngredientIndex(['Egg', 'Milk'])
+    recipe = recipe_cache.Recipe('2', 'Pancakes', ingredients=['Milk', 'Flour'], measures=['', ''])
+
+    scored = search.score_recipe(recipe, index, index.resolve('egg')[1])
+
+    assert (scored.matches, scored.total) == (0, 2)
+
+
+# Busca completa contra o TheMealDB simulado, sem catálogo local: o resultado
+# tem que ser o mesmo de pontuar todas as receitas que usam os ingredientes
+def test_find_recipes_against_stub(tmp_path, monkeypatch):
+    import fake_translator
+    import mealdb
+    import translators
+    from stub_mealdb import StubMealDB, synthetic_meals
+
+    stub = StubMealDB(synthetic_meals(200)).start()
+    try:
+        monkeypatch.setattr(mealdb, 'API_BASE', stub.base_url)
+        monkeypatch.setattr(catalog, 'CATALOG_PATH', str(tmp_path / 'catalog.sqlite3'))
+        monkeypatch.setattr(ingredient_index, '_index', None)
+        monkeypatch.setattr(translators, '_backend', None)
+        fake_translator.install()
+
+        results = search.find_recipes(['chicken', 'garlic'], max_recipes=5)
+
+        index = ingredient_index.get_index()
+        _, user_mask = search.resolve_ingredients(['chicken', 'garlic'], index)
+        expected = [search.score_recipe(recipe_cache.Recipe.from_meal(meal), index, user_mask)
+                    for meal in stub.meals.values()]
+        expected.sort(key=search.recipe_sort_key, reverse=True)
+        assert [search.recipe_sort_key(recipe) for recipe in results] == \
+            [search.recipe_sort_key(recipe) for recipe in expected[:5]]
+        assert all(recipe.matches for recipe in results)
+        assert stub.requests['filter.php'] == 2
+    finally:
+        stub.stop()
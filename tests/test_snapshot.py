@@ -0,0 +1,91 @@
+import pytest
+
+import catalog
+import snapshot
+import translation_cache
+from stub_mealdb import synthetic_meals
+
+
+# Catálogo e cache de traduções novos para cada teste
+@pytest.fixture(autouse=True)
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_PATH', str(tmp_path / 'catalog.sqlite3'))
+    monkeypatch.setattr(translation_cache, 'CACHE_PATH', str(tmp_path / 'translations.sqlite3'))
+
+
+def full_snapshot(meals, translations=None):
+    return snapshot.Snapshot({meal['idMeal']: snapshot.processed_meal(meal) for meal in meals},
+                             translations=translations)
+
+
+def catalog_meals():
+    return {meal['idMeal']: meal for meal in catalog.all_meals()}
+
+
+def test_write_read_round_trip(tmp_path):
+    meals = synthetic_meals(20)
+    original = full_snapshot(meals, {('en', 'pt', 'Onion'): ('Cebola', True)})
+    meta = original.write(tmp_path / 'full.snap')
+
+    loaded = snapshot.read(tmp_path / 'full.snap')
+    assert snapshot.read_meta(tmp_path / 'full.snap') == meta
+    assert loaded.id == original.id
+    assert loaded.meals == original.meals
+    assert loaded.hashes == original.hashes
+    assert loaded.translations == original.translations
+
+
+# Exportar e importar de novo no mesmo catálogo não altera receitas
+def test_reimport_changes_nothing(tmp_path):
+    catalog.upsert_meals(synthetic_meals(30))
+    snapshot.export(tmp_path / 'full.snap')
+
+    result = snapshot.import_file(tmp_path / 'full.snap')
+
+    assert result['meals_changed'] == 0
+
+
+def test_delta_reaches_target(tmp_path):
+    meals = synthetic_meals(30)
+    old = full_snapshot(meals[:20])
+    old.write(tmp_path / 'old.snap')
+    changed = dict(meals[0], strMeal='Renamed')
+    new = full_snapshot([changed] + meals[1:10] + meals[20:])
+    new.write(tmp_path / 'new.snap')
+
+    delta = snapshot.diff(old, new)
+    assert sorted(delta.meals) == sorted([changed['idMeal']] + [meal['idMeal'] for meal in meals[20:]])
+    assert sorted(delta.deleted) == sorted(meal['idMeal'] for meal in meals[10:20])
+    delta.write(tmp_path / 'delta.snap')
+
+    snapshot.import_file(tmp_path / 'old.snap')
+    result = snapshot.import_file(tmp_path / 'delta.snap')
+
+    assert result['meals_changed'] == 11
+    assert catalog_meals() == new.meals
+
+
+def test_delta_requires_base(tmp_path):
+    old = full_snapshot(synthetic_meals(5))
+    old.write(tmp_path / 'old.snap')
+    new = full_snapshot(synthetic_meals(6))
+    new.write(tmp_path / 'new.snap')
+    snapshot.diff(old, new).write(tmp_path / 'delta.snap')
+
+    with pytest.raises(ValueError):
+        snapshot.import_file(tmp_path / 'delta.snap')
+    assert snapshot.import_file(tmp_path / 'delta.snap', force=True)['meals_changed'] == 1
+
+
+# Um delta vazio (mesmo conteúdo) não apaga o registro do snapshot completo
+def test_empty_delta_keeps_full_record(tmp_path):
+    full = full_snapshot(synthetic_meals(5))
+    full.write(tmp_path / 'full.snap')
+    snapshot.import_file(tmp_path / 'full.snap')
+
+    delta = snapshot.diff(full, full)
+    assert delta.id == delta.base
+    snapshot.apply(delta)
+
+    row = catalog.get_db().execute("SELECT kind FROM snapshots WHERE id = ?", (full.id,)).fetchone()
+    assert row['kind'] == 'full'
@@ -0,0 +1,54 @@
+import pytest
+
+import catalog
+import text_index
+import translation_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_PATH', str(tmp_path / 'catalog.sqlite3'))
+    monkeypatch.setattr(translation_cache, 'CACHE_PATH', str(tmp_path / 'translations.sqlite3'))
+
+
+def meal(meal_id, name, *ingredients):
+    data = {'idMeal': meal_id, 'strMeal': name, 'strInstructions': 'Cook.'}
+    for i, ingredient in enumerate(ingredients, 1):
+        data[f'strIngredient{i}'] = ingredient
+    return data
+
+
+def found(index, query):
+    return sorted(doc_id for doc_id, _ in index.search(query))
+
+
+# Receitas removidas do catálogo saem do índice, inclusive do gravado em disco
+def test_deleted_meals_leave_the_index(tmp_path):
+    path = str(tmp_path / 'text_index.json')
+    catalog.upsert_meals([meal('1', 'Chicken Curry', 'Chicken'), meal('2', 'Chicken Pie', 'Chicken')])
+    index = text_index.TextIndex(path)
+    index.refresh(force=True)
+    index.save(force=True)
+    assert found(index, 'chicken') == ['1', '2']
+
+    catalog.delete_meals(['2'])
+    restarted = text_index.TextIndex(path)
+    assert restarted.load()
+    assert restarted.refresh(force=True) == 1
+    assert found(restarted, 'chicken') == ['1']
+    assert found(restarted, 'pie') == []
+
+    restarted.save(force=True)
+    reloaded = text_index.TextIndex(path)
+    reloaded.load()
+    assert len(reloaded) == 1
+
+
+# Repetir a última palavra não desliga a busca por prefixo
+def test_repeated_last_word_keeps_prefix():
+    catalog.upsert_meals([meal('1', 'Chicken Curry', 'Chicken'), meal('2', 'Beef Stew', 'Beef')])
+    index = text_index.TextIndex()
+    index.refresh(force=True)
+
+    assert found(index, 'chic') == ['1']
+    assert found(index, 'chic chic') == ['1']
@@ -0,0 +1,40 @@
+import pytest
+
+import translation_cache
+import translators
+from fake_translator import FakeTranslator
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation_cache, 'CACHE_PATH', str(tmp_path / 'translations.sqlite3'))
+    FakeTranslator.reset_counts()
+
+
+# Tradutor que falha (como em um limite de requisições) a partir da
+# chamada de número fail_at
+class FlakyTranslator(FakeTranslator):
+    fail_at = None
+
+    def translate(self, text):
+        if FlakyTranslator.fail_at is not None and FakeTranslator.calls + 1 >= FlakyTranslator.fail_at:
+            raise RuntimeError("Too many requests")
+        return super().translate(text)
+
+
+def test_failed_batch_keeps_earlier_batches():
+    backend = translators.CachedTranslator(translators.RemoteTranslator(FlakyTranslator, max_chars=12))
+    texts = ['alpha', 'bravo', 'delta', 'gamma', 'kappa', 'sigma']
+
+    FlakyTranslator.fail_at = 3
+    with pytest.raises(translators.TranslationError) as error:
+        backend.translate_batch(texts, 'en', 'pt')
+    assert error.value.results == {text: f"pt:{text}" for text in texts[:4]}
+    assert str(error.value) == "Too many requests"
+
+    # A nova tentativa só envia o que faltou
+    FlakyTranslator.fail_at = None
+    FakeTranslator.reset_counts()
+    results = backend.translate_batch(texts, 'en', 'pt')
+    assert results == {text: f"pt:{text}" for text in texts}
+    assert FakeTranslator.chars == len('kappa\nsigma')
@@ -0,0 +1,310 @@
+import bisect
+import heapq
+import json
+import math
+import os
+import threading
+import time
+
+import catalog
+import ingredient_index
+import recipe_cache
+import translation_cache
+
+# Busca textual local: índice invertido (termo -> receitas) sobre nome,
+# categoria, país, tags, ingredientes e instruções das receitas do catálogo,
+# em inglês e, quando já traduzidas, em português. A pontuação é BM25 com
+# pesos por campo; os termos são normalizados como no índice de ingredientes
+# (sem acento e sem plural) e a última palavra da consulta vale como prefixo.
+# O índice cresce aos poucos (refresh() só lê as receitas novas ou removidas
+# do catálogo) e é gravado em disco, então nenhuma consulta vai à rede.
+#   RECEITA_TEXT_INDEX=arquivo          índice gravado (JSON)
+#   RECEITA_TEXT_INDEX_REFRESH=30       intervalo mínimo entre leituras do catálogo
+
+INDEX_PATH = os.environ.get("RECEITA_TEXT_INDEX", "text_index.json")
+REFRESH_INTERVAL = float(os.environ.get("RECEITA_TEXT_INDEX_REFRESH", "30"))
+# Intervalo mínimo (segundos) entre gravações do índice
+SAVE_INTERVAL = 60
+VERSION = 2
+
+# Peso de cada ocorrência de um termo, por campo
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'ingredients': 2.0,
+    'category': 1.5,
+    'area': 1.5,
+    'tags': 1.0,
+    'instructions': 1.0,
+}
+# Parâmetros do BM25
+K1 = 1.2
+B = 0.75
+# Peso dos termos encontrados só pelo prefixo ("fran" -> frango, frangos...)
+PREFIX_WEIGHT = 0.5
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 50
+# Palavras frequentes nas instruções que não ajudam a encontrar a receita
+_STOPWORDS = {
+    'com', 'em', 'no', 'na', 'nos', 'nas', 'um', 'uma', 'por', 'para', 'ao', 'ate', 'ou', 'se',
+    'que', 'mas', 'mai', 'bem', 'in', 'on', 'to', 'for', 'with', 'it', 'into', 'until', 'then',
+    'or', 'at', 'is', 'be', 'from', 'your', 'you', 'over', 'up',
+}
+
+
+# Função para quebrar um texto nos termos do índice
+def terms(text):
+    return [term for term in ingredient_index.tokens(text) if len(term) > 1 and term not in _STOPWORDS]
+
+
+# Campos indexados de uma receita compacta (recipe_cache.Recipe)
+def recipe_fields(recipe):
+    return {
+        'name': [recipe.name],
+        'category': [recipe.category],
+        'area': [recipe.area],
+        'tags': [recipe.tags.replace(',', ' ')],
+        'ingredients': list(recipe.ingredients),
+        'instructions': [recipe.instructions],
+    }
+
+
+# Campos em português de uma receita, só com o que já está no cache de
+# traduções (sem rede)
+def cached_translation(recipe, translations):
+    fields = {}
+    for field, texts in recipe_fields(recipe).items():
+        translated = [translations[text] for text in texts if text in translations]
+        if translated:
+            fields[field] = translated
+    return fields
+
+
+def _texts(recipe):
+    return [text for texts in recipe_fields(recipe).values() for text in texts if text and text.strip()]
+
+
+# Função para montar o documento de uma receita: {termo: frequência
+# ponderada} e o tamanho ponderado. Em cada campo, os termos iguais nas duas
+# línguas contam uma vez só.
+def document(fields, translated_fields=None):
+    weights = {}
+    length = 0.0
+    for field, weight in FIELD_WEIGHTS.items():
+        field_terms = [term for text in fields.get(field, ()) for term in terms(text)]
+        if translated_fields:
+            seen = set(field_terms)
+            field_terms += [term for text in translated_fields.get(field, ()) for term in terms(text)
+                            if term not in seen]
+        for term in field_terms:
+            weights[term] = weights.get(term, 0.0) + weight
+        length += weight * len(field_terms)
+    return weights, length
+
+
+class TextIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.docs = {}          # id -> {termo: frequência ponderada}
+        self.lengths = {}       # id -> tamanho ponderado
+        self.translated = set()  # ids indexados também em português
+        self.postings = {}      # termo -> {id: frequência ponderada}
+        self.total_length = 0.0
+        self.watermark = 0
+        self.refreshed_at = 0
+        self._vocabulary = []   # termos em ordem alfabética (busca por prefixo)
+        self._vocabulary_stale = False
+        self._norms = {}        # id -> normalização do BM25 pelo tamanho
+        self._changed = False
+        self._saved_at = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _remove(self, doc_id):
+        weights = self.docs.pop(doc_id, None)
+        if weights is None:
+            return
+        for term in weights:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                self._vocabulary_stale = True
+        self.total_length -= self.lengths.pop(doc_id)
+        self.translated.discard(doc_id)
+
+    # Função para tirar um documento do índice
+    def remove(self, doc_id):
+        with self._lock:
+            if doc_id in self.docs:
+                self._remove(doc_id)
+                self._norms = {}
+                self._changed = True
+
+    # Função para incluir (ou substituir) um documento
+    def add(self, doc_id, weights, length, translated=False):
+        with self._lock:
+            self._remove(doc_id)
+            self.docs[doc_id] = weights
+            self.lengths[doc_id] = length
+            self.total_length += length
+            if translated:
+                self.translated.add(doc_id)
+            for term, weight in weights.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                    self._vocabulary_stale = True
+                postings[doc_id] = weight
+            self._norms = {}
+            self._changed = True
+
+    # Função para indexar receitas em inglês (recipe_cache.Recipe), com os
+    # campos em português que já estiverem no cache de traduções
+    def add_recipes(self, recipes):
+        recipes = list(recipes)
+        if not recipes:
+            return
+        try:
+            translation_cache.ensure_seeded()
+            translations = translation_cache.get_many('en', 'pt', [text for recipe in recipes for text in _texts(recipe)])
+        except Exception:
+            translations = {}
+        for recipe in recipes:
+            translated_fields = cached_translation(recipe, translations)
+            weights, length = document(recipe_fields(recipe), translated_fields)
+            self.add(recipe.id, weights, length, translated='name' in translated_fields)
+
+    # Função para reindexar uma receita com a sua tradução (recipe_cache.Recipe
+    # em português), chamada quando ela é traduzida
+    def add_translation(self, recipe, translated):
+        weights, length = document(recipe_fields(recipe), recipe_fields(translated))
+        self.add(recipe.id, weights, length, translated=True)
+
+    # Função para trazer as receitas novas, alteradas ou removidas do
+    # catálogo local
+    def refresh(self, force=False):
+        if not force and time.time() - self.refreshed_at < REFRESH_INTERVAL:
+            return 0
+        with self._lock:
+            self.refreshed_at = time.time()
+            meals, deleted, self.watermark = catalog.meals_since(self.watermark)
+            for doc_id in deleted:
+                self.remove(doc_id)
+            self.add_recipes(recipe_cache.Recipe.from_meal(meal) for meal in meals)
+        self.save()
+        return len(meals) + len(deleted)
+
+    def _expand(self, term, last):
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_stale = False
+        expansions = [(term, 1.0)] if term in self.postings else []
+        if last and len(term) >= MIN_PREFIX:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + MAX_EXPANSIONS + 1]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    expansions.append((candidate, PREFIX_WEIGHT))
+        return expansions
+
+    # Função para buscar receitas por texto livre (português ou inglês).
+    # Retorna [(id, pontuação)], da mais relevante para a menos.
+    def search(self, query, k=10):
+        self.refresh()
+        query_terms = list(dict.fromkeys(terms(query)))
+        with self._lock:
+            count = len(self.docs)
+            if not query_terms or not count:
+                return []
+            if not self._norms:
+                average = self.total_length / count or 1.0
+                self._norms = {doc_id: K1 * (1 - B + B * length / average)
+                               for doc_id, length in self.lengths.items()}
+            norms = self._norms
+            scores = {}
+            for position, term in enumerate(query_terms):
+                for expanded, boost in self._expand(term, position == len(query_terms) - 1):
+                    postings = self.postings[expanded]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    weight = boost * idf * (K1 + 1)
+                    for doc_id, frequency in postings.items():
+                        scores[doc_id] = scores.get(doc_id, 0.0) + weight * frequency / (frequency + norms[doc_id])
+            return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    # Gravação em disco (no máximo a cada SAVE_INTERVAL, salvo force=True)
+    def save(self, force=False):
+        with self._lock:
+            if not self._changed or (not force and time.time() - self._saved_at < SAVE_INTERVAL):
+                return False
+            state = {
+                'version': VERSION,
+                'watermark': self.watermark,
+                'docs': {doc_id: [self.lengths[doc_id], doc_id in self.translated, weights]
+                         for doc_id, weights in self.docs.items()},
+            }
+            self._changed = False
+            self._saved_at = time.time()
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except OSError:
+            return False
+        return True
+
+    # Carrega o índice gravado; se não existir ou for de outra versão,
+    # começa vazio e é montado a partir do catálogo
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get('version') != VERSION:
+            return False
+        with self._lock:
+            for doc_id, (length, translated, weights) in state['docs'].items():
+                self.add(doc_id, weights, length, translated)
+            self.watermark = state['watermark']
+            self._changed = False
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'recipes': len(self.docs),
+                'translated': len(self.translated),
+                'terms': len(self.postings),
+                'watermark': self.watermark,
+            }
+
+
+# Índice único por processo
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TextIndex()
+            _index.load()
+    return _index
+
+
+# Atualiza o índice com uma receita recém-traduzida (só se já estiver em uso)
+def on_translated(recipe, translated):
+    if _index is not None:
+        try:
+            _index.add_translation(recipe, translated)
+        except Exception:
+            pass
+
+
+def search(query, k=10):
+    return get_index().search(query, k)
@@ -0,0 +1,77 @@
+import measures
+import translators
+
+# Tradução pelo backend configurado (translators): por padrão o glossário
+# culinário local e, para o resto, o cache em disco na frente do Google
+# Tradutor. Textos vazios são devolvidos como estão.
+
+RECIPE_FIELDS = ['strMeal', 'strCategory', 'strArea', 'strInstructions']
+INGREDIENT_FIELDS = [f'strIngredient{i}' for i in range(1, 21)]
+MEASURE_FIELDS = [f'strMeasure{i}' for i in range(1, 21)]
+
+# Estatísticas de uma etapa de tradução
+class TranslationStats:
+    def __init__(self):
+        self.requested = 0      # textos recebidos (com repetições)
+        self.unique = 0         # textos distintos
+        self.deduplicated = 0   # repetições descartadas
+        self.glossary_hits = 0  # resolvidos pelo glossário local
+        self.cache_hits = 0     # encontrados no cache em disco
+        self.translated = 0     # enviados ao tradutor
+        self.batches = 0        # requisições feitas ao tradutor
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+# Função para traduzir uma lista de textos
+def translate_batch(texts, source, target, stats=None, backend=None):
+    backend = backend or translators.get_backend()
+    stats = stats if stats is not None else TranslationStats()
+    texts = list(texts)
+    pending = [text for text in dict.fromkeys(texts) if text and text.strip()]
+    stats.requested += len(texts)
+    stats.unique += len(pending)
+    stats.deduplicated += len([text for text in texts if text and text.strip()]) - len(pending)
+
+    translated = backend.translate_batch(pending, source, target, stats) if pending else {}
+    return [translated.get(text, text) for text in texts]
+
+
+def translate(text, source, target, backend=None):
+    return translate_batch([text], source, target, backend=backend)[0]
+
+
+# Função para traduzir várias receitas de uma vez: junta todos os textos de
+# todas as receitas, remove repetições, traduz em lotes e devolve os
+# resultados para cada receita. Das medidas só vai para o tradutor o texto
+# que sobra depois de separar quantidade e unidade.
+def translate_recipes(recipes, stats=None, backend=None):
+    stats = stats if stats is not None else TranslationStats()
+    fields = RECIPE_FIELDS + INGREDIENT_FIELDS
+
+    texts = []
+    parsed_measures = []
+    for recipe_data in recipes:
+        for field in fields:
+            value = recipe_data.get(field)
+            if value and value.strip():
+                texts.append(value)
+        for field in MEASURE_FIELDS:
+            value = recipe_data.get(field)
+            if value and value.strip():
+                measure = measures.parse_measure(value)
+                parsed_measures.append((recipe_data, field, measure))
+                if measure.text:
+                    texts.append(measure.text)
+
+    translated = dict(zip(texts, translate_batch(texts, 'en', 'pt', stats, backend)))
+
+    for recipe_data in recipes:
+        for field in fields:
+            value = recipe_data.get(field)
+            if value and value.strip():
+                recipe_data[field] = translated.get(value, value)
+    for recipe_data, field, measure in parsed_measures:
+        recipe_data[field] = measures.to_portuguese(measure, translated.get(measure.text, measure.text))
+    return stats
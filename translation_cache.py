@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+
+from storage import open_db
+
+# Cache de traduções em disco (SQLite), compartilhado por todos os processos
+# do Streamlit. A chave é (origem, destino, texto).
+
+CACHE_PATH = os.environ.get("RECEITA_TRANSLATION_DB", "translations.sqlite3")
+# Número máximo de traduções guardadas (as entradas do glossário não contam)
+MAX_ENTRIES = int(os.environ.get("RECEITA_TRANSLATION_CACHE_MAX", "100000"))
+GLOSSARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "glossary.tsv")
+
+# O SQLite limita a quantidade de parâmetros por consulta
+_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    text TEXT NOT NULL,
+    translated TEXT NOT NULL,
+    pinned INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (source, target, text)
+);
+CREATE INDEX IF NOT EXISTS idx_translations_lru ON translations(pinned, last_used);
+"""
+
+# Uso das traduções lidas, guardado em memória e gravado junto com a próxima
+# escrita (put_many) ou despejo, para que as leituras não abram transações
+MAX_TOUCHED = 10000
+
+_writes = 0
+_writes_lock = threading.Lock()
+_touched = {}  # (origem, destino, texto) -> último uso
+_touched_lock = threading.Lock()
+
+
+def get_db():
+    return open_db(CACHE_PATH, SCHEMA)
+
+
+# Função para buscar várias traduções de uma vez (retorna só as encontradas)
+def get_many(source, target, texts):
+    texts = list(dict.fromkeys(texts))
+    found = {}
+    db = get_db()
+    for start in range(0, len(texts), _CHUNK):
+        chunk = texts[start:start + _CHUNK]
+        rows = db.execute(
+            f"SELECT text, translated FROM translations "
+            f"WHERE source = ? AND target = ? AND text IN ({','.join('?' * len(chunk))})",
+            [source, target] + chunk
+        ).fetchall()
+        found.update((row['text'], row['translated']) for row in rows)
+
+    if found:
+        now = time.time()
+        with _touched_lock:
+            for text in found:
+                key = (source, target, text)
+                _touched.pop(key, None)
+                _touched[key] = now
+            # Sem escritas por muito tempo: esquece os usos mais antigos
+            while len(_touched) > MAX_TOUCHED:
+                del _touched[next(iter(_touched))]
+    return found
+
+
+# Grava o último uso das traduções lidas (dentro da transação de quem chamou)
+def _flush_touched(db):
+    global _touched
+    with _touched_lock:
+        touched, _touched = _touched, {}
+    if touched:
+        db.executemany(
+            "UPDATE translations SET last_used = MAX(last_used, ?) WHERE source = ? AND target = ? AND text = ?",
+            [(used, source, target, text) for (source, target, text), used in touched.items()]
+        )
+
+
+def get(source, target, text):
+    return get_many(source, target, [text]).get(text)
+
+
+# Função para gravar várias traduções de uma vez
+def put_many(source, target, pairs, pinned=False):
+    global _writes
+    pairs = list(pairs)
+    if not pairs:
+        return
+    now = time.time()
+    db = get_db()
+    with db:
+        _flush_touched(db)
+        if pinned:
+            db.executemany(
+                "INSERT OR REPLACE INTO translations (source, target, text, translated, pinned, last_used) "
+                "VALUES (?, ?, ?, ?, 1, ?)",
+                [(source, target, text, translated, now) for text, translated in pairs]
+            )
+        else:
+            # Não sobrescreve entradas fixas do glossário
+            db.executemany(
+                "INSERT INTO translations (source, target, text, translated, pinned, last_used) "
+                "VALUES (?, ?, ?, ?, 0, ?) "
+                "ON CONFLICT(source, target, text) DO UPDATE SET "
+                "translated = excluded.translated, last_used = excluded.last_used "
+                "WHERE translations.pinned = 0",
+                [(source, target, text, translated, now) for text, translated in pairs]
+            )
+
+    with _writes_lock:
+        _writes += len(pairs)
+        check = _writes >= 1000
+        if check:
+            _writes = 0
+    if check:
+        evict()
+
+
+def put(source, target, text, translated):
+    put_many(source, target, [(text, translated)])
+
+
+# Função para remover as traduções menos usadas quando o limite é atingido
+def evict(max_entries=None):
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    db = get_db()
+    with db:
+        _flush_touched(db)
+    count = db.execute("SELECT COUNT(*) FROM translations WHERE pinned = 0").fetchone()[0]
+    if count <= max_entries:
+        return 0
+    # Remove um pouco além do necessário para não despejar a cada gravação
+    excess = count - int(max_entries * 0.9)
+    with db:
+        db.execute(
+            "DELETE FROM translations WHERE rowid IN ("
+            "SELECT rowid FROM translations WHERE pinned = 0 ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+    return excess
+
+
+# Todas as traduções guardadas: [(origem, destino, texto, tradução, fixa)]
+def all_entries():
+    rows = get_db().execute(
+        "SELECT source, target, text, translated, pinned FROM translations ORDER BY source, target, text"
+    ).fetchall()
+    return [(row['source'], row['target'], row['text'], row['translated'], bool(row['pinned'])) for row in rows]
+
+
+def size():
+    return get_db().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+
+# Função para ler o glossário (TSV com colunas "en" e "pt")
+def read_glossary(path=GLOSSARY_PATH):
+    pairs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split('\t')
+            if len(parts) != 2 or parts == ['en', 'pt']:
+                continue
+            pairs.append((parts[0].strip(), parts[1].strip()))
+    return pairs
+
+
+def _case_variants(en, pt):
+    variants = {(en, pt), (en.lower(), pt.lower()), (en.capitalize(), pt.capitalize())}
+    return list(variants)
+
+
+# Função para pré-carregar o cache com o glossário, nos dois sentidos
+def seed_glossary(path=GLOSSARY_PATH):
+    en_pt = []
+    pt_en = []
+    for en, pt in read_glossary(path):
+        for en_text, pt_text in _case_variants(en, pt):
+            en_pt.append((en_text, pt_text))
+            pt_en.append((pt_text, en_text))
+    put_many('en', 'pt', en_pt, pinned=True)
+    put_many('pt', 'en', pt_en, pinned=True)
+    return len(en_pt)
+
+
+_seeded = False
+_seed_lock = threading.Lock()
+
+
+# Semeia o glossário uma única vez por processo
+def ensure_seeded():
+    global _seeded
+    with _seed_lock:
+        if not _seeded:
+            try:
+                seed_glossary()
+            except OSError:
+                pass
+            _seeded = True
@@ -0,0 +1,253 @@
+import os
+import threading
+
+from deep_translator import GoogleTranslator
+
+import measures
+import metrics
+import translation_cache
+
+# Backends de tradução. Todos têm a mesma interface:
+#   translate_batch(texts, source, target, stats=None) -> {texto: tradução}
+# devolvendo só o que conseguiram traduzir (se falharem no meio, levantam
+# TranslationError com o que já traduziram), e stats() com os contadores
+# acumulados do backend. stats (TranslationStats), se informado, recebe os
+# contadores da chamada.
+#   RECEITA_TRANSLATOR=chain     glossário local, depois cache em disco + Google (padrão)
+#   RECEITA_TRANSLATOR=glossary  só o glossário (sem rede)
+#   RECEITA_TRANSLATOR=remote    só cache em disco + Google
+
+BACKEND = os.environ.get("RECEITA_TRANSLATOR", "chain")
+# O Google Tradutor aceita até 5000 caracteres por requisição
+MAX_BATCH_CHARS = 4500
+SEPARATOR = '\n'
+
+
+# Falha no meio de uma tradução; results tem o que já foi traduzido antes
+# do erro, para que quem chamou possa guardar
+class TranslationError(Exception):
+    def __init__(self, error, results):
+        super().__init__(str(error))
+        self.results = results
+
+
+class Translator:
+    name = 'translator'
+
+    def __init__(self):
+        self.counts = dict.fromkeys(('requested', 'translated', 'requests', 'errors'), 0)
+        self._lock = threading.Lock()
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counts[name] += amount
+
+    def translate_batch(self, texts, source, target, stats=None):
+        raise NotImplementedError
+
+    def translate(self, text, source, target):
+        return self.translate_batch([text], source, target).get(text)
+
+    def stats(self):
+        with self._lock:
+            return {self.name: dict(self.counts)}
+
+
+# Glossário culinário local (ingredientes, categorias, países e unidades).
+# Nunca sai do processo; a caixa do texto original é mantida.
+class GlossaryTranslator(Translator):
+    name = 'glossary'
+
+    def __init__(self, pairs=None):
+        super().__init__()
+        if pairs is None:
+            try:
+                pairs = translation_cache.read_glossary()
+            except OSError:
+                pairs = []
+        self.tables = {('en', 'pt'): {}, ('pt', 'en'): {}}
+        for en, pt in pairs:
+            self.add(en, pt)
+        # Unidades só no sentido inglês -> português ("cups" -> "xícaras")
+        for en, pt in measures.unit_glossary():
+            self.tables[('en', 'pt')].setdefault(en.casefold(), pt)
+
+    def add(self, en, pt):
+        self.tables[('en', 'pt')][en.casefold()] = pt
+        self.tables[('pt', 'en')][pt.casefold()] = en
+
+    @staticmethod
+    def _match_case(original, translated):
+        if original.islower():
+            return translated.lower()
+        if original.isupper() and len(original) > 1:
+            return translated.upper()
+        if original[:1].isupper() and original[1:].islower():
+            return translated.capitalize()
+        return translated
+
+    def translate_batch(self, texts, source, target, stats=None):
+        table = self.tables.get((source, target), {})
+        results = {}
+        for text in texts:
+            found = table.get(text.strip().casefold())
+            if found is not None:
+                results[text] = self._match_case(text.strip(), found)
+        self._count(requested=len(texts), translated=len(results))
+        if stats is not None:
+            stats.glossary_hits += len(results)
+        return results
+
+
+# Google Tradutor, com os textos agrupados em poucas requisições
+class RemoteTranslator(Translator):
+    name = 'remote'
+
+    def __init__(self, client=None, max_chars=MAX_BATCH_CHARS):
+        super().__init__()
+        self.client = client or GoogleTranslator
+        self.max_chars = max_chars
+
+    # Função para agrupar textos em lotes que respeitam o limite do tradutor.
+    # Textos com quebra de linha vão sozinhos, pois o separador é '\n'.
+    def pack_batches(self, texts):
+        batch = []
+        batch_size = 0
+        for text in texts:
+            if SEPARATOR in text or len(text) >= self.max_chars:
+                yield [text]
+                continue
+            if batch and batch_size + len(text) + 1 > self.max_chars:
+                yield batch
+                batch, batch_size = [], 0
+            batch.append(text)
+            batch_size += len(text) + 1
+        if batch:
+            yield batch
+
+    def _request(self, stats):
+        self._count(requests=1)
+        metrics.count('translation.requests')
+        if stats is not None:
+            stats.batches += 1
+
+    def translate_batch(self, texts, source, target, stats=None):
+        texts = list(texts)
+        translator = self.client(source=source, target=target)
+        results = {}
+        try:
+            for batch in self.pack_batches(texts):
+                self._request(stats)
+                translated = translator.translate(SEPARATOR.join(batch))
+                parts = translated.split(SEPARATOR) if translated and len(batch) > 1 else [translated]
+                if len(parts) != len(batch):
+                    # O tradutor juntou ou quebrou linhas; traduz o lote item a item
+                    for _ in batch:
+                        self._request(stats)
+                    parts = translator.translate_batch(batch)
+                for text, part in zip(batch, parts):
+                    if part and part.strip():
+                        results[text] = part.strip() if len(batch) > 1 else part
+        except Exception as e:
+            self._count(errors=1)
+            raise TranslationError(e, results) from e
+        finally:
+            self._count(requested=len(texts), translated=len(results))
+        if stats is not None:
+            stats.translated += len(texts)
+        return results
+
+
+# Cache de traduções em disco (translation_cache) na frente de outro backend
+class CachedTranslator(Translator):
+    name = 'cache'
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def translate_batch(self, texts, source, target, stats=None):
+        translation_cache.ensure_seeded()
+        results = translation_cache.get_many(source, target, texts)
+        metrics.count('translation.cache_hits', len(results))
+        if stats is not None:
+            stats.cache_hits += len(results)
+        missing = [text for text in texts if text not in results]
+        self._count(requested=len(texts), translated=len(results))
+        if missing:
+            metrics.count('translation.remote_texts', len(missing))
+            try:
+                new_pairs = self.backend.translate_batch(missing, source, target, stats)
+            except TranslationError as e:
+                # Guarda os lotes já traduzidos; a próxima tentativa só envia o resto
+                translation_cache.put_many(source, target, e.results.items())
+                e.results = {**results, **e.results}
+                raise
+            translation_cache.put_many(source, target, new_pairs.items())
+            results.update(new_pairs)
+        return results
+
+    def stats(self):
+        result = super().stats()
+        result.update(self.backend.stats())
+        return result
+
+
+# Tenta cada backend em ordem; cada um recebe só o que os anteriores não
+# traduziram
+class ChainTranslator(Translator):
+    name = 'chain'
+
+    def __init__(self, backends):
+        super().__init__()
+        self.backends = list(backends)
+
+    def translate_batch(self, texts, source, target, stats=None):
+        results = {}
+        pending = list(texts)
+        for backend in self.backends:
+            if not pending:
+                break
+            try:
+                results.update(backend.translate_batch(pending, source, target, stats))
+            except TranslationError as e:
+                e.results = {**results, **e.results}
+                raise
+            pending = [text for text in pending if text not in results]
+        self._count(requested=len(texts), translated=len(results))
+        return results
+
+    def stats(self):
+        result = super().stats()
+        for backend in self.backends:
+            result.update(backend.stats())
+        return result
+
+
+def build_backend(name=BACKEND, client=None):
+    if name == 'glossary':
+        return GlossaryTranslator()
+    remote = CachedTranslator(RemoteTranslator(client))
+    if name == 'remote':
+        return remote
+    return ChainTranslator([GlossaryTranslator(), remote])
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+# Backend único por processo
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = build_backend()
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import areas
+import images
+import ingredient_index
+import mealdb
+import metrics
+import recipe_cache
+import recipes as recipes_mod
+import search
+import text_index
+
+# Aquecimento dos caches em segundo plano, ao iniciar o app: mapa de países,
+# índices locais, listas de receitas dos ingredientes mais buscados e
+# detalhes, traduções e imagens das primeiras receitas de cada um. As
+# chamadas externas passam por um limitador de taxa para não competir com os
+# usuários.
+#   RECEITA_WARM=0                 desliga
+#   RECEITA_WARM_TOP=20            ingredientes aquecidos
+#   RECEITA_WARM_RECIPES=5         receitas por ingrediente
+#   RECEITA_WARM_RATE=2            chamadas externas por segundo
+#   RECEITA_WARM_CONFIG=arquivo    ingredientes fixos (um por linha)
+#   RECEITA_QUERY_LOG=arquivo      registro das buscas (JSON lines, reduzido às
+#                                  últimas LOG_WINDOW buscas ao passar de LOG_MAX_BYTES)
+
+ENABLED = os.environ.get("RECEITA_WARM", "1") == "1"
+TOP_INGREDIENTS = int(os.environ.get("RECEITA_WARM_TOP", "20"))
+RECIPES_PER_INGREDIENT = int(os.environ.get("RECEITA_WARM_RECIPES", "5"))
+RATE = float(os.environ.get("RECEITA_WARM_RATE", "2"))
+WARM_IMAGES = os.environ.get("RECEITA_WARM_IMAGES", "1") == "1"
+CONFIG_PATH = os.environ.get(
+    "RECEITA_WARM_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_ingredients.txt")
+)
+QUERY_LOG = os.environ.get("RECEITA_QUERY_LOG", "query_log.jsonl")
+# Buscas mais recentes consideradas no ranking
+LOG_WINDOW = 5000
+# Tamanho a partir do qual o registro é reduzido às LOG_WINDOW últimas buscas
+LOG_MAX_BYTES = 2 * 1024 * 1024
+# Largura das imagens aquecidas (a dos resultados da busca)
+IMAGE_WIDTH = 240
+
+
+# Limitador de taxa simples: no máximo `rate` chamadas por segundo
+class RateLimiter:
+    def __init__(self, rate=RATE):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Registro das buscas (um JSON por linha), usado para escolher o que aquecer
+_log_lock = threading.Lock()
+
+
+def record_query(ingredients, path=None):
+    path = path or QUERY_LOG
+    line = json.dumps({'ts': time.time(), 'ingredients': list(ingredients)}, ensure_ascii=False)
+    try:
+        with _log_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                size = f.tell()
+            if size > LOG_MAX_BYTES:
+                _truncate_log(path)
+    except OSError:
+        pass
+
+
+# Função para ler as últimas `count` linhas de um arquivo, de trás para frente
+# em blocos (sem ler o arquivo inteiro)
+def _tail(path, count, block=64 * 1024):
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(block, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    if position > 0:
+        lines = lines[1:]  # a primeira pode estar cortada
+    return lines[-count:]
+
+
+# Mantém as últimas buscas, até LOG_WINDOW linhas e metade de LOG_MAX_BYTES
+def _truncate_log(path, window=LOG_WINDOW):
+    lines = _tail(path, window)
+    size = sum(len(line) + 1 for line in lines)
+    start = 0
+    while start < len(lines) and size > LOG_MAX_BYTES // 2:
+        size -= len(lines[start]) + 1
+        start += 1
+    lines = lines[start:]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in lines)
+    os.replace(tmp, path)
+
+
+def _read_log(path, window=LOG_WINDOW):
+    try:
+        lines = _tail(path, window)
+    except OSError:
+        return []
+    queries = []
+    for line in lines:
+        try:
+            queries.append(json.loads(line)['ingredients'])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return queries
+
+
+def _read_config(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    except OSError:
+        return []
+
+
+# Função para escolher os ingredientes a aquecer: os mais buscados no
+# registro e, para completar, os do arquivo de configuração
+def top_ingredients(limit=TOP_INGREDIENTS, log_path=None, config_path=None):
+    counts = Counter(term.strip().lower() for query in _read_log(log_path or QUERY_LOG)
+                     for term in query if term.strip())
+    chosen = [term for term, _ in counts.most_common(limit)]
+    for term in _read_config(config_path or CONFIG_PATH):
+        if len(chosen) >= limit:
+            break
+        if term.lower() not in chosen:
+            chosen.append(term.lower())
+    return chosen
+
+
+class Warmer:
+    def __init__(self, top=TOP_INGREDIENTS, per_ingredient=RECIPES_PER_INGREDIENT, rate=RATE,
+                 warm_images=WARM_IMAGES):
+        self.top = top
+        self.per_ingredient = per_ingredient
+        self.warm_images = warm_images
+        self.limiter = RateLimiter(rate)
+        self.progress = {
+            'state': 'idle', 'step': None, 'ingredients': 0, 'ingredients_done': 0,
+            'recipes': 0, 'calls': 0, 'errors': 0, 'started_at': None, 'finished_at': None,
+        }
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _update(self, **changes):
+        with self._lock:
+            self.progress.update(changes)
+
+    def _add(self, name, amount=1):
+        with self._lock:
+            self.progress[name] += amount
+        metrics.count(f"warmer.{name}", amount)
+
+    # Chamada que pode ir à rede (limitada) ou só local (limited=False)
+    def _call(self, func, *args, limited=True):
+        if limited:
+            self.limiter.acquire()
+            self._add('calls')
+        try:
+            return func(*args)
+        except Exception:
+            self._add('errors')
+            return None
+
+    def _warm_ingredient(self, term):
+        # Pode chamar o tradutor remoto (termo fora do glossário e do cache)
+        english, _ = self._call(search.resolve_ingredients, [term]) or ([None], 0)
+        if not english[0]:
+            return
+        url = mealdb.api_url("filter.php", i=english[0])
+        data = mealdb.cache_get(url) or self._call(mealdb.cached_api_request, url)
+        recipe_ids = [meal['idMeal'] for meal in (data or {}).get('meals') or []][:self.per_ingredient]
+
+        recipes = []
+        for recipe_id in recipe_ids:
+            base = recipe_cache.get_recipe(recipe_id)
+            if base is None:
+                base = (self._call(search.fetch_recipe_details, recipe_id) or (None, None))[1]
+            if base is not None:
+                recipes.append(recipes_mod.LazyRecipe(base))
+                self._add('recipes')
+
+        if any(not recipe.is_translated for recipe in recipes):
+            self._call(recipes_mod.translate_many, recipes)
+        if self.warm_images:
+            for recipe in recipes:
+                if recipe.base.thumb:
+                    self._call(images.get_image, recipe.base.thumb, IMAGE_WIDTH)
+
+    def run(self):
+        self._update(state='running', started_at=time.time())
+        try:
+            self._update(step='areas')
+            self._call(areas.get_registry().ensure_loaded)
+            self._update(step='index')
+            self._call(ingredient_index.get_index)
+            self._update(step='text_index')
+            self._call(text_index.get_index().refresh, limited=False)
+
+            terms = top_ingredients(self.top)
+            self._update(step='ingredients', ingredients=len(terms))
+            for term in terms:
+                self._warm_ingredient(term)
+                self._add('ingredients_done')
+            self._update(state='done', step=None)
+        except Exception:
+            self._update(state='failed')
+        finally:
+            self._update(finished_at=time.time())
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self._thread
+            self._thread = threading.Thread(target=self.run, name="cache-warmer", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def status(self):
+        with self._lock:
+            return dict(self.progress)
+
+
+_warmer = Warmer()
+
+
+# Inicia o aquecimento (uma vez por processo; não bloqueia)
+def start():
+    if ENABLED:
+        _warmer.start()
+    return _warmer
+
+
+def status():
+    return _warmer.status()